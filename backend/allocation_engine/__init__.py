@@ -1,3 +1,4 @@
-from .allocator import AllocationEngine
+from .allocator import ALLOCATION_METHODS, AllocationEngine
+from .risk_parity import ERCSolver, erc_weights
 
-__all__ = ["AllocationEngine"]
+__all__ = ["ALLOCATION_METHODS", "AllocationEngine", "ERCSolver", "erc_weights"]
@@ -1,54 +1,117 @@
 """
 Allocation Engine: regime-adaptive dynamic allocation.
-Methods: Risk Parity, Momentum, Correlation-aware, regime-based templates.
+Methods: Risk Parity (equal risk contribution), inverse volatility, Momentum,
+Correlation-aware, regime-based templates.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+
+from .risk_parity import ERCSolver
 
 from ..regime_engine.detector import (
     REGIME_CRASH,
     REGIME_HIGH_VOL,
     REGIME_TRENDING_UP,
     REGIME_TRENDING_DOWN,
+    REGIME_LABELS,
+    regime_code,
+    regime_label,
 )
 
+# Per-asset exposure multiplier by regime code (REGIME_LABELS order) for asset-level regimes.
+ASSET_REGIME_TILT = np.array([1.0, 0.6, 0.5, 0.25])
+
+ALLOCATION_METHODS = ("regime", "risk_parity", "inverse_vol", "momentum", "equal")
+
 
 class AllocationEngine:
     """
     Produces portfolio weights from regime + optional features.
     Supports risk parity, momentum, and regime-based defensive shifts.
+    get_weights returns one dict; get_weight_matrix returns an R x N array for R rebalance dates.
     """
 
     def __init__(self, tickers: List[str]):
         self.tickers = list(tickers)
+        # Warm-started across calls: rebalance dates are requested in order.
+        self.erc_solver = ERCSolver()
+        # Normalized regime templates, regime code x asset (row order = REGIME_LABELS).
+        self.regime_templates = np.array(
+            [[self._normalize(self._regime_weights(label))[t] for t in self.tickers] for label in REGIME_LABELS]
+        )
 
     def get_weights(
         self,
-        regime: str,
+        regime: Union[str, int],
         returns: Optional[pd.DataFrame] = None,
         cov_matrix: Optional[pd.DataFrame] = None,
         momentum_scores: Optional[pd.Series] = None,
-        method: str = "regime",  # "regime" | "risk_parity" | "momentum" | "equal"
+        method: str = "regime",  # "regime" | "risk_parity" | "inverse_vol" | "momentum" | "equal"
+        asset_regimes: Optional[np.ndarray] = None,
     ) -> Dict[str, float]:
         """
         Returns normalized weights dict. If method is 'regime', uses regime templates.
         Otherwise uses quantitative method then optionally tilts by regime.
+        regime may be a label or an int8 regime code. asset_regimes (one int8 code per ticker,
+        e.g. a row of RegimeEngine.generate_asset_regime_codes) tilts each asset by ASSET_REGIME_TILT.
         """
         n = len(self.tickers)
         if method == "risk_parity" and cov_matrix is not None:
             w = self._risk_parity_weights(cov_matrix)
+        elif method == "inverse_vol" and cov_matrix is not None:
+            w = self._inverse_vol_weights(cov_matrix)
         elif method == "momentum" and momentum_scores is not None:
             w = self._momentum_weights(momentum_scores)
         elif method == "equal":
             w = {t: 1.0 / n for t in self.tickers}
         else:
-            w = self._regime_weights(regime)
+            row = self.regime_templates[regime_code(regime)]
+            if asset_regimes is None:
+                return dict(zip(self.tickers, row.tolist()))
+            w = dict(zip(self.tickers, row))
+        if asset_regimes is not None:
+            tilt = ASSET_REGIME_TILT[np.asarray(asset_regimes, dtype=np.intp)]
+            w = {t: w.get(t, 0.0) * m for t, m in zip(self.tickers, tilt)}
         return self._normalize(w)
 
-    def _regime_weights(self, regime: str) -> Dict[str, float]:
+    def get_weight_matrix(
+        self,
+        regime_codes: np.ndarray,
+        method: str = "regime",
+        cov: Optional[np.ndarray] = None,
+        momentum_scores: Optional[np.ndarray] = None,
+        asset_regimes: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Batch get_weights: R x N weight matrix (columns = tickers) for R rebalance dates.
+        regime_codes: R int8 codes. cov: R x N x N covariances (risk_parity / inverse_vol; for
+        risk_parity also any iterable of N x N matrices, solved in order with warm starts);
+        momentum_scores: R x N (momentum); asset_regimes: R x N codes (per-asset tilt).
+        Same methods and fallbacks as get_weights, computed row-wise in one pass.
+        """
+        codes = np.asarray(regime_codes, dtype=np.intp)
+        n = len(self.tickers)
+        if method == "risk_parity" and cov is not None:
+            w = self.erc_solver.solve_batch(cov)
+        elif method == "inverse_vol" and cov is not None:
+            vols = np.sqrt(np.einsum("rii->ri", np.asarray(cov, dtype=float)))
+            vols = np.where(vols <= 0, 1e-8, vols)
+            w = 1.0 / vols
+        elif method == "momentum" and momentum_scores is not None:
+            w = np.clip(np.nan_to_num(np.asarray(momentum_scores, dtype=float), nan=0.0), 0.0, None)
+        elif method == "equal":
+            w = np.full((len(codes), n), 1.0 / n)
+        else:
+            w = self.regime_templates[codes]
+        if asset_regimes is not None:
+            w = w * ASSET_REGIME_TILT[np.asarray(asset_regimes, dtype=np.intp)]
+        return self._normalize_rows(w)
+
+    def _regime_weights(self, regime: Union[str, int]) -> Dict[str, float]:
         """Regime-based templates (equity = first ticker, bond = second)."""
+        regime = regime_label(regime)
         n = len(self.tickers)
         if regime == REGIME_TRENDING_UP:
             w = {self.tickers[0]: 0.7}
@@ -77,7 +140,12 @@ class AllocationEngine:
         return {t: 1.0 / n for t in self.tickers}
 
     def _risk_parity_weights(self, cov_matrix: pd.DataFrame) -> Dict[str, float]:
-        """Inverse-volatility risk parity."""
+        """Equal-risk-contribution weights (correlation-aware), warm-started from the last solve."""
+        w = self.erc_solver.solve(np.asarray(cov_matrix, dtype=float))
+        return dict(zip(self.tickers, w.tolist()))
+
+    def _inverse_vol_weights(self, cov_matrix: pd.DataFrame) -> Dict[str, float]:
+        """Inverse-volatility weights (ignores correlations)."""
         try:
             vols = np.sqrt(np.diag(cov_matrix))
             vols = np.where(vols <= 0, 1e-8, vols)
@@ -96,6 +164,12 @@ class AllocationEngine:
         w = (positive / positive.sum()).to_dict()
         return w
 
+    def _normalize_rows(self, w: np.ndarray) -> np.ndarray:
+        """Row-wise _normalize: rows with non-positive (or NaN) totals become equal weight."""
+        total = w.sum(axis=1, keepdims=True)
+        valid = np.isfinite(total) & (total > 0)
+        return np.where(valid, w / np.where(valid, total, 1.0), 1.0 / len(self.tickers))
+
     def _normalize(self, w: Dict[str, float]) -> Dict[str, float]:
         total = sum(w.values())
         if total <= 0:
@@ -0,0 +1,90 @@
+"""
+Equal Risk Contribution (ERC) solver: long-only weights whose risk contributions
+w_i * (Cov w)_i are all equal. Newton's method on the convex formulation
+    min_x  0.5 x' Cov x - (1/N) sum(log x_i),   w = x / sum(x)
+with a backtracking line search that keeps x > 0. Each solve warm-starts from the
+previous solution, so consecutive rebalance dates converge in a few iterations.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class ERCSolver:
+    """
+    Stateful ERC solver: solve(cov) for one date, solve_batch(covs) for rebalance dates in order.
+    The last solution is kept as the next warm start. A tiny ridge (relative to the mean variance)
+    keeps the Newton system positive definite; for more assets than window rows, pass a shrunk
+    covariance instead of the sample one. Covariances with non-finite entries fall back to equal weight.
+    """
+
+    def __init__(self, tol: float = 1e-8, max_iter: int = 50, ridge: float = 1e-8):
+        self.tol = tol
+        self.max_iter = max_iter
+        self.ridge = ridge
+        self.weights: Optional[np.ndarray] = None
+        self.iterations = 0  # Newton steps of the last solve
+
+    def reset(self) -> None:
+        self.weights = None
+        self.iterations = 0
+
+    def solve(self, cov: np.ndarray) -> np.ndarray:
+        cov = np.asarray(cov, dtype=float)
+        n = len(cov)
+        self.iterations = 0
+        if not np.isfinite(cov).all():
+            return np.full(n, 1.0 / n)
+        var = np.diag(cov)
+        cov = cov + self.ridge * max(var.mean(), 1e-12) * np.eye(n)
+        b = 1.0 / n
+
+        if self.weights is not None and len(self.weights) == n:
+            w0 = self.weights
+        else:
+            inv_vol = 1.0 / np.sqrt(np.diag(cov))
+            w0 = inv_vol / inv_vol.sum()
+        # Scale so that x' Cov x = sum(b) = 1 (the optimum's scale).
+        x = w0 / np.sqrt(w0 @ cov @ w0)
+
+        def objective(v: np.ndarray) -> float:
+            return 0.5 * v @ cov @ v - b * np.log(v).sum()
+
+        f = objective(x)
+        for _ in range(self.max_iter):
+            cx = cov @ x
+            if np.max(np.abs(x * cx - b)) <= self.tol * b:
+                break
+            grad = cx - b / x
+            step = np.linalg.solve(cov + np.diag(b / x ** 2), -grad)
+            shrink = step < 0
+            t = min(1.0, 0.99 * np.min(-x[shrink] / step[shrink])) if shrink.any() else 1.0
+            slope = grad @ step
+            # Backtracking (Armijo) line search; near the optimum the predicted decrease is
+            # below objective rounding, so the Newton step is taken as is.
+            if -slope > 1e-12:
+                while objective(x + t * step) > f + 1e-4 * t * slope:
+                    t *= 0.5
+                    if t < 1e-12:
+                        break
+                if t < 1e-12:
+                    break  # no descent left at machine precision
+            x = x + t * step
+            f = objective(x)
+            self.iterations += 1
+
+        w = x / x.sum()
+        self.weights = w
+        return w
+
+    def solve_batch(self, covs: Iterable[np.ndarray]) -> np.ndarray:
+        """R x N weights for a sequence of N x N covariances (array or lazy iterable), warm-started in order."""
+        return np.array([self.solve(cov) for cov in covs])
+
+
+def erc_weights(cov: np.ndarray, x0: Optional[np.ndarray] = None, tol: float = 1e-8) -> np.ndarray:
+    """One-off ERC weights, optionally warm-started from x0 (weights)."""
+    solver = ERCSolver(tol=tol)
+    solver.weights = x0
+    return solver.solve(cov)
@@ -4,18 +4,33 @@ FastAPI: portfolio, regime, risk, backtest (with/without risk), stress test, dec
 
 import os
 import sys
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 # Ensure project root on path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+import numpy as np
+import pandas as pd
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from backend.core_engine import CoreEngine
 from backend.realtime_simulator import RealtimeSimulator
 from backend.stress_test_engine import StressTestEngine
+from backend.data_engine import feature_cache
+from backend.risk_engine import VAR_METHODS
+from backend.backtest_engine import (
+    StrategySpec,
+    SweepEngine,
+    backtest_result_store,
+    parameter_grid,
+    random_configs,
+    resolve_config,
+    rolling_metrics,
+    strategy_grid,
+)
 from backend import config as cfg
 
 app = FastAPI(title="Autonomous Portfolio & Risk Management API")
@@ -30,6 +45,7 @@ app.add_middleware(
 # Global state: one backtest result cache, one realtime sim
 _backtest_cache: Optional[Dict] = None
 _sim: Optional[RealtimeSimulator] = None
+_sweep: Optional[SweepEngine] = None
 _default_tickers = ["SPY", "TLT", "GLD"]
 _default_start = "2015-01-01"
 _default_end = "2024-01-01"
@@ -41,6 +57,47 @@ class BacktestRequest(BaseModel):
     end_date: str = "2024-01-01"
     tickers: List[str] = ["SPY", "TLT", "GLD"]
     risk_level: str = "MEDIUM"
+    allocation_method: str = "regime"  # regime | risk_parity | inverse_vol | momentum | equal
+    var_limit: Optional[float] = None  # max daily VaR, e.g. 0.02
+
+
+class StrategyModel(BaseModel):
+    name: str
+    with_risk: bool = True
+    risk_level: str = "MEDIUM"
+    allocation_method: str = "regime"
+
+
+class StrategiesRequest(BaseModel):
+    start_date: str = "2015-01-01"
+    end_date: str = "2024-01-01"
+    tickers: List[str] = ["SPY", "TLT", "GLD"]
+    strategies: Optional[List[StrategyModel]] = None  # default: LOW/MEDIUM/HIGH x with/without risk
+
+
+class SweepRequest(BaseModel):
+    start_date: str = "2015-01-01"
+    end_date: str = "2024-01-01"
+    tickers: List[str] = ["SPY", "TLT", "GLD"]
+    grid: Optional[Dict[str, List[Any]]] = None  # e.g. {"risk_level": ["LOW", "HIGH"], "rebalance_frequency": [5, 21]}
+    space: Optional[Dict[str, Any]] = None  # random search: list = choice, {"low", "high"} = uniform range
+    n_samples: int = 100
+    seed: int = 42
+    max_workers: Optional[int] = None
+
+
+class MonteCarloRequest(BaseModel):
+    start_date: str = "2015-01-01"
+    end_date: str = "2024-01-01"
+    tickers: List[str] = ["SPY", "TLT", "GLD"]
+    risk_level: str = "MEDIUM"
+    with_risk: bool = True
+    method: str = "bootstrap"  # bootstrap | regime
+    n_paths: int = Field(cfg.MONTE_CARLO_PATHS, ge=1, le=cfg.MONTE_CARLO_MAX_PATHS)
+    n_days: Optional[int] = Field(None, ge=2, le=cfg.MONTE_CARLO_MAX_DAYS)  # path length (default: history length)
+    block_size: int = Field(cfg.MONTE_CARLO_BLOCK_SIZE, ge=1)
+    seed: int = 42
+    confidence: float = Field(0.90, gt=0, lt=1)
 
 
 class StressTestRequest(BaseModel):
@@ -64,6 +121,10 @@ class RiskLevelRequest(BaseModel):
     level: str  # LOW | MEDIUM | HIGH
 
 
+class CacheInvalidateRequest(BaseModel):
+    tickers: Optional[List[str]] = None  # None = drop everything
+
+
 # ---------- Endpoints ----------
 @app.get("/")
 def root():
@@ -100,9 +161,17 @@ def get_regime():
 
 
 @app.get("/risk")
-def get_risk_status():
+def get_risk_status(series: bool = False):
+    """Risk level plus latest VaR / CVaR per method of the last backtest (series=true: full rolling series)."""
     state = _sim.get_state() if _sim else {}
-    return {"risk_status": state.get("risk_level", "MEDIUM")}
+    out = {"risk_status": state.get("risk_level", "MEDIUM")}
+    var = (_backtest_cache or {}).get("var")
+    if var:
+        out["confidence"] = cfg.VAR_CONFIDENCE
+        out["var"] = {method: rows[-1] if rows else None for method, rows in var.items()}
+        if series:
+            out["var_series"] = var
+    return out
 
 
 @app.get("/engine/log")
@@ -138,36 +207,230 @@ def get_backtest_results():
     }
 
 
+@app.get("/backtest/rolling")
+def get_backtest_rolling(window: int = 63):
+    """Rolling Sharpe / vol, drawdown and underwater days of the cached with/without-risk equity curves."""
+    if _backtest_cache is None:
+        return {"window": window, "series": []}
+    equity = pd.DataFrame({
+        name: pd.Series(
+            [p["value"] for p in _backtest_cache[key]],
+            index=pd.DatetimeIndex([p["date"] for p in _backtest_cache[key]]),
+        )
+        for name, key in (("with_risk", "equity_with_risk"), ("without_risk", "equity_without_risk"))
+    })
+    rolling = rolling_metrics(equity, window)
+    series = []
+    for k, date in enumerate(equity.index):
+        point = {"date": str(date)[:10]}
+        for metric, frame in rolling.items():
+            for name in equity.columns:
+                value = frame[name].iloc[k]
+                point[f"{metric}_{name}"] = None if pd.isna(value) else float(value)
+        series.append(point)
+    return {"window": window, "series": series}
+
+
+def _backtest_entry(engine: CoreEngine) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Run the with/without-risk comparison: (dated columns: equity + VaR / CVaR per method, payload)."""
+    result = engine.run_backtest_comparison()
+    columns = {"with_risk": result["equity_with_risk"], "without_risk": result["equity_without_risk"]}
+    for method in VAR_METHODS:
+        var = engine.rolling_var(result["weights_with_risk"], method)
+        columns[f"var_{method}"] = var["var"]
+        columns[f"cvar_{method}"] = var["cvar"]
+    frame = pd.DataFrame(columns).reindex(result["equity_with_risk"].index)
+    payload = {
+        "metrics_with_risk": result["metrics_with_risk"],
+        "metrics_without_risk": result["metrics_without_risk"],
+        "decision_log": engine.get_decision_log(limit=500),
+        "correlation_matrix": result.get("correlation_matrix", []),
+        "correlation_labels": result.get("correlation_labels", []),
+    }
+    return frame, payload
+
+
+def _backtest_cache_from(frame: pd.DataFrame, payload: Dict[str, Any]) -> Dict[str, Any]:
+    dates = frame.index.strftime("%Y-%m-%d").tolist()
+    var = {}
+    for method in VAR_METHODS:
+        values = frame[f"var_{method}"].to_numpy()
+        tails = frame[f"cvar_{method}"].to_numpy()
+        keep = np.flatnonzero(~(np.isnan(values) | np.isnan(tails)))
+        var[method] = [
+            {"date": dates[k], "var": v, "cvar": c}
+            for k, v, c in zip(keep.tolist(), values[keep].tolist(), tails[keep].tolist())
+        ]
+    return {
+        **payload,
+        "equity_with_risk": [{"date": d, "value": v} for d, v in zip(dates, frame["with_risk"].to_numpy().tolist())],
+        "equity_without_risk": [
+            {"date": d, "value": v} for d, v in zip(dates, frame["without_risk"].to_numpy().tolist())
+        ],
+        "dates": list(frame.index.astype(str)),
+        "var": var,
+    }
+
+
 @app.post("/run_backtest")
 def run_backtest(req: BacktestRequest):
-    """Run backtest with and without risk; return both metrics and equity series."""
+    """
+    Run backtest with and without risk; return both metrics and equity series. Results are
+    served from the on-disk backtest store when an identical request already ran.
+    """
     global _backtest_cache
     try:
         engine = CoreEngine(
             req.tickers, req.start_date, req.end_date,
             risk_level=req.risk_level,
+            allocation_method=req.allocation_method,
+            var_limit=req.var_limit,
         )
-        result = engine.run_backtest_comparison()
-        equity_with = result["equity_with_risk"]
-        equity_no = result["equity_without_risk"]
-        _backtest_cache = {
-            "metrics_with_risk": result["metrics_with_risk"],
-            "metrics_without_risk": result["metrics_without_risk"],
-            "equity_with_risk": [{"date": str(d)[:10], "value": float(v)} for d, v in equity_with.items()],
-            "equity_without_risk": [{"date": str(d)[:10], "value": float(v)} for d, v in equity_no.items()],
-            "dates": result["dates"],
-            "decision_log": engine.get_decision_log(limit=500),
-            "correlation_matrix": result.get("correlation_matrix", []),
-            "correlation_labels": result.get("correlation_labels", []),
-        }
+        key = engine.result_key()
+        stored = backtest_result_store.get(key)
+        if stored is None:
+            frame, payload = _backtest_entry(engine)
+            # Ranges reaching today may still change as new bars arrive: only final ones are stored.
+            if pd.Timestamp(req.end_date) <= pd.Timestamp.today().normalize():
+                backtest_result_store.put(key, frame, payload)
+        else:
+            frame, payload = stored
+        _backtest_cache = _backtest_cache_from(frame, payload)
         return {
             "message": "Backtest executed successfully",
-            "metrics_with_risk": result["metrics_with_risk"],
-            "metrics_without_risk": result["metrics_without_risk"],
-            "suspicious": result["metrics_with_risk"].get("suspicious", False),
+            "metrics_with_risk": payload["metrics_with_risk"],
+            "metrics_without_risk": payload["metrics_without_risk"],
+            "suspicious": payload["metrics_with_risk"].get("suspicious", False),
+            "cached": stored is not None,
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/run_strategies")
+def run_strategies(req: StrategiesRequest):
+    """Backtest several strategies (risk level, risk on/off, allocation method) in one pass."""
+    try:
+        engine = CoreEngine(req.tickers, req.start_date, req.end_date)
+        specs = (
+            [StrategySpec(s.name, s.with_risk, s.risk_level, s.allocation_method) for s in req.strategies]
+            if req.strategies
+            else strategy_grid()
+        )
+        result = engine.run_strategies(specs)
+        return {
+            "strategies": [spec._asdict() for spec in specs],
+            "metrics": result["metrics"],
+            "equity": {
+                name: [{"date": str(d)[:10], "value": float(v)} for d, v in curve.items()]
+                for name, curve in result["equity"].items()
+            },
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _records(frame) -> List[Dict[str, Any]]:
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
+
+
+@app.post("/sweep")
+def start_sweep(req: SweepRequest):
+    """Start a parameter sweep in the background (grid, or random search over space)."""
+    global _sweep
+    if _sweep is not None and _sweep.progress["running"]:
+        raise HTTPException(status_code=409, detail="A sweep is already running")
+    if req.grid:
+        configs = parameter_grid(**req.grid)
+    elif req.space:
+        space = {
+            k: (v["low"], v["high"]) if isinstance(v, dict) else v
+            for k, v in req.space.items()
         }
+        configs = random_configs(space, req.n_samples, req.seed)
+    else:
+        raise HTTPException(status_code=400, detail="Provide grid or space")
+    try:
+        configs = [resolve_config(c) for c in configs]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        engine = CoreEngine(req.tickers, req.start_date, req.end_date)
+        _sweep = engine.sweep_engine(max_workers=req.max_workers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    threading.Thread(target=_run_sweep, args=(_sweep, configs), daemon=True).start()
+    return {"message": "Sweep started", "total": len(configs)}
+
+
+def _run_sweep(sweep: SweepEngine, configs: List[Dict[str, Any]]) -> None:
+    try:
+        sweep.run(configs)
+    except Exception:
+        pass  # kept in sweep.progress["error"], reported by /sweep/status
+
+
+@app.get("/sweep/status")
+def sweep_status(top: int = 10, sort_by: str = "Sharpe Ratio"):
+    """Sweep progress and the best configurations so far."""
+    if _sweep is None:
+        return {"done": 0, "total": 0, "running": False, "cancelled": False, "error": None, "top": []}
+    results = _sweep.results()
+    if sort_by in results.columns:
+        results = results.sort_values(sort_by, ascending=False)
+    return {**_sweep.progress, "top": _records(results.head(top))}
+
+
+@app.get("/sweep/results")
+def sweep_results(limit: Optional[int] = None):
+    """Finished sweep configurations (parameters + metrics), by config_id."""
+    if _sweep is None:
+        return {"results": []}
+    results = _sweep.results()
+    return {"results": _records(results if limit is None else results.head(limit))}
+
+
+@app.post("/sweep/cancel")
+def cancel_sweep():
+    if _sweep is not None:
+        _sweep.cancel()
+    return {"message": "Sweep cancelled"}
+
+
+@app.post("/monte_carlo")
+def run_monte_carlo(req: MonteCarloRequest):
+    """Strategy over resampled paths: metric distributions with confidence intervals, equity percentile bands."""
+    try:
+        engine = CoreEngine(req.tickers, req.start_date, req.end_date, risk_level=req.risk_level)
+        result = engine.run_monte_carlo(
+            n_paths=req.n_paths,
+            method=req.method,
+            n_days=req.n_days,
+            block_size=req.block_size,
+            with_risk=req.with_risk,
+            seed=req.seed,
+            confidence=req.confidence,
+            keep_equity=False,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    bands = result["bands"]
+    return {
+        "method": req.method,
+        "n_paths": req.n_paths,
+        "confidence": req.confidence,
+        "summary": result["summary"],
+        "equity_bands": [
+            {"date": str(d)[:10], "low": float(a), "median": float(b), "high": float(c)}
+            for d, a, b, c in zip(result["index"], bands["low"], bands["median"], bands["high"])
+        ],
+    }
 
 
 @app.post("/stress_test")
@@ -254,6 +517,18 @@ def set_risk_level(req: RiskLevelRequest):
     return {"status": "ok", "risk_level": req.level}
 
 
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Feature cache hit/miss counters and memory use."""
+    return feature_cache.stats()
+
+
+@app.post("/cache/invalidate")
+def invalidate_cache(req: CacheInvalidateRequest):
+    """Drop cached market data (for the given tickers, or all)."""
+    return {"status": "ok", "invalidated": feature_cache.invalidate(req.tickers)}
+
+
 @app.post("/rebalance")
 def rebalance():
     """Manual rebalance: no-op in sim (sim rebalances on schedule)."""
@@ -1,4 +1,35 @@
 from .runner import BacktestEngine
-from .metrics import backtest_metrics, flag_suspicious
+from .schedule import rebalance_indices
+from .context import BacktestContext
+from .kernel import KernelResult, simulate
+from .multi import MultiStrategyBacktest, StrategySpec, strategy_grid
+from .metrics import backtest_metrics, batch_metrics, flag_suspicious, rolling_metrics
+from .monte_carlo import MONTE_CARLO_METHODS, MonteCarloBacktest
+from .result_store import BacktestResultStore, backtest_result_store, result_key
+from .sweep import SweepEngine, parameter_grid, random_configs, resolve_config
+from .walk_forward import run_walk_forward
 
-__all__ = ["BacktestEngine", "backtest_metrics", "flag_suspicious"]
+__all__ = [
+    "BacktestContext",
+    "BacktestEngine",
+    "BacktestResultStore",
+    "KernelResult",
+    "MONTE_CARLO_METHODS",
+    "MonteCarloBacktest",
+    "MultiStrategyBacktest",
+    "StrategySpec",
+    "SweepEngine",
+    "backtest_metrics",
+    "backtest_result_store",
+    "batch_metrics",
+    "flag_suspicious",
+    "parameter_grid",
+    "random_configs",
+    "run_walk_forward",
+    "rebalance_indices",
+    "resolve_config",
+    "result_key",
+    "rolling_metrics",
+    "simulate",
+    "strategy_grid",
+]
@@ -0,0 +1,86 @@
+"""
+Backtest Context: the equity curve so far, handed to allocation callbacks in O(1).
+Values live in a preallocated array (filled by the backtest kernel, or appended one at a time by
+the real-time simulator); a DrawdownTracker is fed each value once, so the current value, running
+peak and drawdown are read without rescanning history, and history is a zero-copy view.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..risk_engine.drawdown import DrawdownTracker
+
+
+class BacktestContext:
+    """
+    len(ctx) values are known: history (read-only view), value, peak, drawdown, max_drawdown,
+    time_under_water. advance_to(n) exposes values already written to the buffer (kernel);
+    append(value) writes the next one, growing an owned buffer by doubling. Views taken before
+    a growth keep pointing at the old buffer.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 0,
+        index: Optional[pd.Index] = None,
+        buffer: Optional[np.ndarray] = None,
+    ):
+        self._owned = buffer is None
+        self._buffer = np.full(max(int(capacity), 1), np.nan) if buffer is None else buffer
+        self.index = index
+        self.tracker = DrawdownTracker()
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def advance_to(self, n: int) -> "BacktestContext":
+        """Mark buffer[:n] as known (written by the caller); feeds the new values to the tracker."""
+        for value in self._buffer[self._n : n]:
+            self.tracker.update(value)
+        self._n = max(self._n, n)
+        return self
+
+    def append(self, value: float) -> None:
+        if self._n == len(self._buffer):
+            if not self._owned:
+                raise ValueError("BacktestContext buffer is full")
+            grown = np.full(2 * len(self._buffer), np.nan)
+            grown[: self._n] = self._buffer
+            self._buffer = grown
+        self._buffer[self._n] = value
+        self._n += 1
+        self.tracker.update(value)
+
+    @property
+    def history(self) -> np.ndarray:
+        view = self._buffer[: self._n].view()
+        view.flags.writeable = False
+        return view
+
+    def series(self) -> pd.Series:
+        """History as a Series (zero-copy; dated when index is set)."""
+        index = self.index[: self._n] if self.index is not None else None
+        return pd.Series(self.history, index=index, copy=False)
+
+    @property
+    def value(self) -> float:
+        return self.tracker.value
+
+    @property
+    def peak(self) -> float:
+        return self.tracker.peak
+
+    @property
+    def drawdown(self) -> float:
+        return self.tracker.drawdown
+
+    @property
+    def max_drawdown(self) -> float:
+        return self.tracker.max_drawdown
+
+    @property
+    def time_under_water(self) -> int:
+        return self.tracker.time_under_water
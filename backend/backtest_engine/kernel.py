@@ -0,0 +1,91 @@
+"""
+Backtest Kernel: the BacktestEngine simulation on contiguous NumPy arrays.
+A weight vector is held from its rebalance day to the next; each day's return is the
+NaN-skipping dot product of weights and asset returns, and the rebalance day pays
+transaction_cost * turnover. Equity compounds by a sequential running product, so the
+curve is bit-identical to stepping day by day.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class KernelResult(NamedTuple):
+    equity: np.ndarray  # T, equity[0] = initial capital
+    turnover: np.ndarray  # T, sum |w_new - w_old| on rebalance days, 0 elsewhere
+    cost: np.ndarray  # T, transaction cost as a fraction of equity
+
+
+def portfolio_returns(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise sum of values * weights, NaN products skipped (as pandas Series.sum)."""
+    products = values * weights
+    return np.nansum(products, axis=-1)
+
+
+def turnover(weights: np.ndarray, previous: np.ndarray) -> float:
+    return float(np.nansum(np.abs(weights - previous)))
+
+
+def compound(start_value, daily_returns: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """
+    value[k] = value[k - 1] * (1 + r[k] - cost[k]), value[-1] = start_value, as one running product
+    along the last axis (leading axes: independent curves, e.g. strategies).
+    """
+    factors = np.empty(daily_returns.shape[:-1] + (daily_returns.shape[-1] + 1,))
+    factors[..., 0] = start_value
+    factors[..., 1:] = 1 + daily_returns
+    factors[..., 1:] -= cost
+    return np.multiply.accumulate(factors, axis=-1)[..., 1:]
+
+
+def advance(
+    equity: np.ndarray,
+    values: np.ndarray,
+    weights: np.ndarray,
+    start: int,
+    stop: int,
+    cost=0.0,
+) -> None:
+    """
+    Fill equity[..., start:stop] holding weights from day start (which pays cost) to stop - 1.
+    equity T with weights N, or S x T with weights S x N (and cost per row) for S strategies;
+    values T x N, or S x T x N when each strategy / path has its own returns.
+    """
+    weights = np.asarray(weights, dtype=float)
+    daily = portfolio_returns(values[..., start:stop, :], weights[..., None, :])
+    costs = np.zeros(daily.shape)
+    costs[..., 0] = cost
+    equity[..., start:stop] = compound(equity[..., start - 1], daily, costs)
+
+
+def simulate(
+    values: np.ndarray,
+    rebalance_days: np.ndarray,
+    weights: np.ndarray,
+    transaction_cost: float = 0.0005,
+    initial_capital: float = 1_000_000,
+) -> KernelResult:
+    """
+    values: T x N asset returns; rebalance_days: increasing day indices (the first >= 1, e.g.
+    rebalance_indices); weights: R x N, row r held from rebalance_days[r] to the next one.
+    Days before the first rebalance hold cash.
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    days = np.asarray(rebalance_days, dtype=np.intp)
+    weights = np.asarray(weights, dtype=float).reshape(len(days), values.shape[1])
+    n_days = len(values)
+    equity = np.full(n_days, float(initial_capital))
+    turnovers = np.zeros(n_days)
+    costs = np.zeros(n_days)
+    if n_days < 2 or not len(days):
+        return KernelResult(equity, turnovers, costs)
+    previous = np.vstack([np.zeros((1, values.shape[1])), weights[:-1]])
+    turnovers[days] = np.nansum(np.abs(weights - previous), axis=1)
+    costs[days] = transaction_cost * turnovers[days]
+    lengths = np.diff(np.append(days, n_days))
+    held = np.repeat(weights, lengths, axis=0)
+    start = days[0]
+    daily = portfolio_returns(values[start:], held)
+    equity[start:] = compound(initial_capital, daily, costs[start:])
+    return KernelResult(equity, turnovers, costs)
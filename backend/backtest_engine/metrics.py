@@ -2,7 +2,7 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
 
 from .. import config as cfg
 
@@ -46,6 +46,108 @@ def backtest_metrics(
     }
 
 
+def _equity_matrix(equity: Union[pd.Series, pd.DataFrame, np.ndarray]) -> np.ndarray:
+    """Curves x time float array from a Series, a DataFrame (time x curves) or an array (curves x time)."""
+    if isinstance(equity, pd.Series):
+        return equity.to_numpy(dtype=float)[None, :]
+    if isinstance(equity, pd.DataFrame):
+        return equity.to_numpy(dtype=float).T
+    return np.atleast_2d(np.asarray(equity, dtype=float))
+
+
+def batch_metrics(
+    equity: Union[pd.DataFrame, np.ndarray],
+    index: Optional[pd.Index] = None,
+    risk_free_rate: float = 0.02,
+) -> pd.DataFrame:
+    """
+    backtest_metrics for many equity curves in one vectorized pass. equity: DataFrame (dates x
+    curves) or array (curves x time, dates in index; required). Returns one row per curve.
+    """
+    names = equity.columns if isinstance(equity, pd.DataFrame) else None
+    if index is None:
+        if names is None:
+            raise ValueError("batch_metrics needs index (the dates) when equity is an array")
+        index = equity.index
+    e = _equity_matrix(equity)
+    columns = ["CAGR", "Annual Volatility", "Sharpe Ratio", "Sortino Ratio", "Max Drawdown", "Calmar Ratio"]
+    if e.shape[1] < 2:
+        return pd.DataFrame(np.nan, index=names if names is not None else range(len(e)), columns=columns)
+    years = (index[-1] - index[0]).days / 365.25
+    if years <= 0:
+        years = 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = e[:, 1:] / e[:, :-1] - 1
+        cagr = (e[:, -1] / e[:, 0]) ** (1 / years) - 1
+        std = np.nanstd(ret, axis=1, ddof=1) if ret.shape[1] > 1 else np.full(len(e), np.nan)
+        ann_vol = np.where(std > 0, std * np.sqrt(252), 0.0)
+        excess = np.nanmean(ret, axis=1) * 252 - risk_free_rate
+        sharpe = np.where(ann_vol > 0, excess / np.where(ann_vol > 0, ann_vol, 1.0), 0.0)
+        negative = ret < 0
+        n_down = negative.sum(axis=1)
+        down_mean = np.where(negative, ret, 0.0).sum(axis=1) / np.maximum(n_down, 1)
+        down_dev = np.where(negative, ret - down_mean[:, None], 0.0)
+        down_std = np.sqrt((down_dev * down_dev).sum(axis=1) / np.maximum(n_down - 1, 1))
+        downside_vol = np.where((n_down > 1) & (down_std > 0), down_std * np.sqrt(252), 1e-8)
+        sortino = excess / downside_vol
+        cummax = np.fmax.accumulate(e, axis=1)
+        dd = (e - cummax) / np.where(cummax == 0, np.nan, cummax)
+        max_dd = np.nanmin(dd, axis=1)
+        calmar = np.where(max_dd != 0, cagr / np.abs(np.where(max_dd != 0, max_dd, 1.0)), 0.0)
+    table = np.column_stack([cagr, ann_vol, sharpe, sortino, max_dd, calmar])
+    return pd.DataFrame(table, index=names if names is not None else range(len(e)), columns=columns)
+
+
+def rolling_metrics(
+    equity: Union[pd.Series, pd.DataFrame],
+    window: int = 63,
+    risk_free_rate: float = 0.02,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Rolling analytics per curve (dates x curves each): "rolling_volatility" and "rolling_sharpe"
+    (annualized, over the last window daily returns; NaN until a full window), "drawdown" from
+    the running peak and "underwater_days" since that peak. Vectorized over all curves.
+    """
+    frame = equity.to_frame() if isinstance(equity, pd.Series) else equity
+    e = frame.to_numpy(dtype=float)
+    t = len(e)
+    ret = np.full_like(e, np.nan)
+    ret[1:] = e[1:] / e[:-1] - 1
+    vol = np.full_like(e, np.nan)
+    sharpe = np.full_like(e, np.nan)
+    if t > window and window > 1:
+        r = ret[1:]
+        shift = np.nanmean(r, axis=0)  # centering keeps the running sums well conditioned
+        c = np.nan_to_num(r - shift)
+        s1 = np.vstack([np.zeros((1, e.shape[1])), np.cumsum(c, axis=0)])
+        s2 = np.vstack([np.zeros((1, e.shape[1])), np.cumsum(c * c, axis=0)])
+        sum1 = s1[window:] - s1[:-window]
+        sum2 = s2[window:] - s2[:-window]
+        mean = sum1 / window
+        var = np.maximum((sum2 - window * mean * mean) / (window - 1), 0.0)
+        ann_vol = np.sqrt(var * 252)
+        excess = (mean + shift) * 252 - risk_free_rate
+        vol[window:] = ann_vol
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe[window:] = np.where(ann_vol > 0, excess / ann_vol, 0.0)
+    cummax = np.fmax.accumulate(e, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drawdown = (e - cummax) / np.where(cummax == 0, np.nan, cummax)
+    steps = np.arange(t)[:, None]
+    last_peak = np.maximum.accumulate(np.where(e >= cummax, steps, 0), axis=0)
+    underwater = steps - last_peak
+
+    def wrap(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=frame.index, columns=frame.columns)
+
+    return {
+        "rolling_volatility": wrap(vol),
+        "rolling_sharpe": wrap(sharpe),
+        "drawdown": wrap(drawdown),
+        "underwater_days": wrap(underwater),
+    }
+
+
 def flag_suspicious(metrics: Dict[str, float]) -> Dict[str, Any]:
     """Add flags for suspiciously good metrics (e.g. overfitting)."""
     out = dict(metrics)
@@ -0,0 +1,226 @@
+"""
+Monte Carlo Backtest: the regime-allocation strategy (with the RiskEngine overlay) run across
+P resampled return paths at once, for distributions of CAGR, Sharpe, max drawdown and Calmar.
+Paths (P x T x N returns with a regime code per day):
+- bootstrap: stationary block bootstrap of historical days (returns and their regime codes move together)
+- regime: fitted regime-switching model (Markov chain on the historical regime codes, Gaussian
+  returns per regime); the simulated regime is what the strategy sees
+Paths run in chunks (max_chunk_bytes); within a chunk every rebalance is one vectorized step
+over all paths (rolling covariance, apply_matrix overlay, kernel advance), and metrics are
+computed per chunk, so the full P x T equity is only kept on request.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .. import config as cfg
+from ..allocation_engine.allocator import AllocationEngine
+from ..data_engine.synthetic import bootstrap_indices
+from ..regime_engine.detector import REGIME_LABELS
+from ..risk_engine.engine import RiskEngine
+from .kernel import advance
+from .metrics import batch_metrics
+from .schedule import rebalance_indices
+
+MONTE_CARLO_METHODS = ("bootstrap", "regime")
+DISTRIBUTION_METRICS = ("CAGR", "Sharpe Ratio", "Max Drawdown", "Calmar Ratio")
+
+
+def summarize(samples: Dict[str, np.ndarray], confidence: float = 0.90) -> Dict[str, Dict[str, float]]:
+    """Mean, median, std and a central percentile interval (ci_low, ci_high) per metric."""
+    tail = (1.0 - confidence) / 2 * 100
+    out = {}
+    for name, values in samples.items():
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            out[name] = {"mean": None, "median": None, "std": None, "ci_low": None, "ci_high": None}
+            continue
+        low, high = np.percentile(values, [tail, 100 - tail])
+        out[name] = {
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "std": float(values.std()),
+            "ci_low": float(low),
+            "ci_high": float(high),
+        }
+    return out
+
+
+class MonteCarloBacktest:
+    """
+    run(n_paths, method) -> {"metrics": metric -> P values, "summary": summarize(metrics),
+    "bands": {"low", "median", "high"} equity percentiles per day, "index": dates, and
+    "equity": P x T array when keep_equity}. Risk parameters default to config.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        regime_codes: np.ndarray,
+        vol_target: float = cfg.VOL_TARGET,
+        max_drawdown_limit: float = cfg.MAX_DRAWDOWN_LIMIT,
+        exposure_floor: float = cfg.EXPOSURE_FLOOR,
+        with_risk: bool = True,
+        vol_window: int = 21,
+        rebalance_frequency: int = cfg.REBALANCE_FREQUENCY,
+        transaction_cost: float = cfg.TRANSACTION_COST,
+        initial_capital: float = cfg.INITIAL_CAPITAL,
+        seed: int = 42,
+        max_chunk_bytes: int = 128 * 1024 * 1024,
+    ):
+        self.returns = returns
+        self.values = returns.to_numpy(dtype=float)
+        self.regime_codes = np.asarray(regime_codes, dtype=np.int8)
+        self.vol_window = vol_window
+        self.rebalance_frequency = rebalance_frequency
+        self.transaction_cost = transaction_cost
+        self.initial_capital = initial_capital
+        self.seed = seed
+        self.max_chunk_bytes = max_chunk_bytes
+        self.templates = AllocationEngine(list(returns.columns)).regime_templates
+        self.risk = RiskEngine(
+            returns,
+            vol_target=vol_target,
+            max_drawdown_limit=max_drawdown_limit,
+            exposure_floor=exposure_floor,
+            enabled=with_risk,
+            vol_window=vol_window,
+        )
+
+    def run(
+        self,
+        n_paths: int = cfg.MONTE_CARLO_PATHS,
+        method: str = "bootstrap",
+        n_days: Optional[int] = None,
+        block_size: int = cfg.MONTE_CARLO_BLOCK_SIZE,
+        confidence: float = 0.90,
+        keep_equity: bool = True,
+        band_paths: int = cfg.MONTE_CARLO_BAND_PATHS,
+    ) -> Dict[str, Any]:
+        """
+        Bands use every path when n_paths <= band_paths (or keep_equity), otherwise the first
+        band_paths paths (paths are i.i.d., so they are a random subsample).
+        """
+        if method not in MONTE_CARLO_METHODS:
+            raise ValueError(f"Unknown Monte Carlo method: {method}")
+        n_days = n_days or len(self.values)
+        index = self._index(n_days)
+        kept = n_paths if keep_equity else min(n_paths, band_paths)
+        equity = np.empty((kept, n_days))
+        metrics = {name: np.empty(n_paths) for name in DISTRIBUTION_METRICS}
+        if method == "bootstrap":
+            paths = self.bootstrap_paths(n_paths, n_days, block_size)
+        else:
+            paths = self.regime_paths(n_paths, n_days)
+        for lo, values, codes in paths:
+            chunk = self.simulate(values, codes)
+            hi = lo + len(chunk)
+            table = batch_metrics(chunk, index=index)
+            for name in DISTRIBUTION_METRICS:
+                metrics[name][lo:hi] = table[name].to_numpy()
+            if lo < kept:
+                equity[lo : min(hi, kept)] = chunk[: kept - lo]
+        tail = (1.0 - confidence) / 2 * 100
+        low, median, high = np.percentile(equity, [tail, 50, 100 - tail], axis=0)
+        result = {
+            "metrics": metrics,
+            "summary": summarize(metrics, confidence),
+            "bands": {"low": low, "median": median, "high": high},
+            "index": index,
+        }
+        if keep_equity:
+            result["equity"] = equity
+        return result
+
+    def bootstrap_paths(
+        self, n_paths: int, n_days: int, block_size: int = cfg.MONTE_CARLO_BLOCK_SIZE
+    ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """(first path, returns chunk x T x N, regime codes chunk x T) from a stationary block bootstrap."""
+        rng = np.random.default_rng(self.seed)
+        rows = bootstrap_indices(rng, len(self.values), n_days, block_size, n_paths, stationary=True)
+        for lo in range(0, n_paths, self._chunk(n_days)):
+            idx = rows[lo : lo + self._chunk(n_days)]
+            yield lo, self.values[idx], self.regime_codes[idx]
+
+    def regime_paths(self, n_paths: int, n_days: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """(first path, returns, regime codes) chunks from the fitted regime-switching model."""
+        rng = np.random.default_rng(self.seed)
+        transition, mean, chol, start = self.fit_regime_model()
+        cumulative = np.cumsum(transition, axis=1)
+        for lo in range(0, n_paths, self._chunk(n_days)):
+            size = min(self._chunk(n_days), n_paths - lo)
+            states = np.empty((size, n_days), dtype=np.int8)
+            states[:, 0] = rng.choice(len(start), size=size, p=start)
+            for t in range(1, n_days):
+                u = rng.random(size)
+                states[:, t] = (u[:, None] > cumulative[states[:, t - 1]]).sum(axis=1)
+            np.minimum(states, len(start) - 1, out=states)
+            values = rng.standard_normal((size, n_days, self.values.shape[1]))
+            for k in range(len(start)):
+                mask = states == k
+                values[mask] = mean[k] + values[mask] @ chol[k].T
+            yield lo, values, states
+
+    def fit_regime_model(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (transition K x K, mean K x N, Cholesky factor of covariance K x N x N, initial distribution K)
+        from the historical regime codes and returns. Regimes never observed (or with a singular
+        covariance) use the full-sample mean / covariance; transitions add one pseudo-count per cell.
+        """
+        k, n = len(REGIME_LABELS), self.values.shape[1]
+        codes = self.regime_codes
+        counts = np.ones((k, k))
+        np.add.at(counts, (codes[:-1], codes[1:]), 1.0)
+        transition = counts / counts.sum(axis=1, keepdims=True)
+        overall_cov = np.cov(self.values, rowvar=False).reshape(n, n)
+        mean = np.tile(self.values.mean(axis=0), (k, 1))
+        chol = np.tile(np.linalg.cholesky(overall_cov + 1e-12 * np.eye(n)), (k, 1, 1))
+        for r in range(k):
+            rows = self.values[codes == r]
+            if len(rows) > n:
+                try:
+                    chol[r] = np.linalg.cholesky(np.cov(rows, rowvar=False).reshape(n, n))
+                    mean[r] = rows.mean(axis=0)
+                except np.linalg.LinAlgError:
+                    pass
+        start = np.bincount(codes, minlength=k).astype(float)
+        return transition, mean, chol, start / start.sum()
+
+    def simulate(self, values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Equity P x T of the strategy on P paths (values P x T x N, codes P x T), one step per rebalance."""
+        n_paths, n_days, _ = values.shape
+        equity = np.full((n_paths, n_days), float(self.initial_capital))
+        peak = equity[:, 0].copy()
+        previous = np.zeros((n_paths, values.shape[2]))
+        days = rebalance_indices(n_days, self.rebalance_frequency)
+        w_len = self.vol_window
+        for k, start in enumerate(days):
+            stop = days[k + 1] if k + 1 < len(days) else n_days
+            weights = self.templates[codes[:, start]]
+            if self.risk.enabled:
+                variance = np.zeros(n_paths)
+                if start >= w_len:
+                    window = values[:, start - w_len : start]
+                    centered = window - window.mean(axis=1, keepdims=True)
+                    cov = np.einsum("pwi,pwj->pij", centered, centered) / (w_len - 1)
+                    variance = np.einsum("pi,pij,pj->p", weights, cov, weights) * 252
+                drawdowns = (equity[:, start - 1] - peak) / peak
+                weights, _ = self.risk.apply_matrix(
+                    weights, np.full(n_paths, start), drawdowns=drawdowns, portfolio_variance=variance
+                )
+            cost = self.transaction_cost * np.nansum(np.abs(weights - previous), axis=1)
+            advance(equity, values, weights, start, stop, cost)
+            np.maximum(peak, equity[:, start:stop].max(axis=1), out=peak)
+            previous = weights
+        return equity
+
+    def _chunk(self, n_days: int) -> int:
+        return max(1, self.max_chunk_bytes // (n_days * self.values.shape[1] * 8))
+
+    def _index(self, n_days: int) -> pd.DatetimeIndex:
+        if n_days <= len(self.returns):
+            return self.returns.index[:n_days]
+        return pd.bdate_range(self.returns.index[0], periods=n_days)
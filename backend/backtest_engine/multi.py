@@ -0,0 +1,106 @@
+"""
+Multi-Strategy Backtest: several allocation strategies advanced together in one pass over returns.
+On each rebalance day every strategy's allocation function runs (in order) on its own equity
+curve; the holding period that follows is advanced for all strategies at once by the kernel.
+Each strategy's curve is identical to a BacktestEngine run of the same function.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .context import BacktestContext
+from .kernel import advance, turnover
+from .schedule import rebalance_indices, weight_series
+
+
+class StrategySpec(NamedTuple):
+    """One strategy of a comparison: risk overlay on/off, risk level preset, allocation method."""
+
+    name: str
+    with_risk: bool = True
+    risk_level: str = "MEDIUM"
+    allocation_method: str = "regime"
+
+
+def strategy_grid(
+    risk_levels: Sequence[str] = ("LOW", "MEDIUM", "HIGH"),
+    with_risk: Sequence[bool] = (True, False),
+    allocation_methods: Sequence[str] = ("regime",),
+) -> List[StrategySpec]:
+    """Every combination, named e.g. "MEDIUM/with_risk" (method appended when several are given)."""
+    specs = []
+    for method in allocation_methods:
+        for level in risk_levels:
+            for risk in with_risk:
+                name = f"{level}/{'with_risk' if risk else 'without_risk'}"
+                if len(allocation_methods) > 1:
+                    name += f"/{method}"
+                specs.append(StrategySpec(name, risk, level, method))
+    return specs
+
+
+class MultiStrategyBacktest:
+    """
+    allocation_functions: name -> allocation_function(i, context), as for BacktestEngine.
+    run() -> DataFrame of equity curves (dates x names). Per strategy: weights_history[name],
+    weights(name) as a frame, turnover / costs (dates x names).
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        allocation_functions: Dict[str, Callable],
+        rebalance_frequency: int = 21,
+        transaction_cost: float = 0.0005,
+        initial_capital: float = 1_000_000,
+    ):
+        self.returns = returns
+        self.allocation_functions = dict(allocation_functions)
+        self.rebalance_frequency = rebalance_frequency
+        self.transaction_cost = transaction_cost
+        self.initial_capital = initial_capital
+        self.weights_history: Dict[str, List[Tuple[pd.Timestamp, pd.Series]]] = {
+            name: [] for name in self.allocation_functions
+        }
+        self.turnover: Optional[pd.DataFrame] = None
+        self.costs: Optional[pd.DataFrame] = None
+
+    def run(self) -> pd.DataFrame:
+        dates = self.returns.index
+        columns = self.returns.columns
+        names = list(self.allocation_functions)
+        values = np.ascontiguousarray(self.returns.to_numpy(dtype=float))
+        n_days, n_strategies = len(dates), len(names)
+        equity = np.full((n_strategies, n_days), float(self.initial_capital))
+        turnovers = np.zeros((n_strategies, n_days))
+        costs = np.zeros((n_strategies, n_days))
+        previous = np.zeros((n_strategies, len(columns)))
+        current = np.zeros((n_strategies, len(columns)))
+        contexts = [BacktestContext(index=dates, buffer=row) for row in equity]
+
+        days = rebalance_indices(n_days, self.rebalance_frequency)
+        for k, start in enumerate(days):
+            stop = days[k + 1] if k + 1 < len(days) else n_days
+            for s, name in enumerate(names):
+                raw = self.allocation_functions[name](start, contexts[s].advance_to(start))
+                weights = weight_series(raw, columns)
+                self.weights_history[name].append((dates[start], weights.copy()))
+                current[s] = weights.to_numpy(dtype=float)
+                turnovers[s, start] = turnover(current[s], previous[s])
+                costs[s, start] = self.transaction_cost * turnovers[s, start]
+            advance(equity, values, current, start, stop, costs[:, start])
+            previous[:] = current
+
+        self.turnover = pd.DataFrame(turnovers.T, index=dates, columns=names)
+        self.costs = pd.DataFrame(costs.T, index=dates, columns=names)
+        return pd.DataFrame(equity.T, index=dates, columns=names)
+
+    def weights(self, name: str) -> pd.DataFrame:
+        """Weights set at each rebalance of strategy name (rebalance dates x tickers)."""
+        history = self.weights_history[name]
+        if not history:
+            return pd.DataFrame(columns=self.returns.columns, dtype=float)
+        dates, rows = zip(*history)
+        return pd.DataFrame(list(rows), index=pd.DatetimeIndex(dates), columns=self.returns.columns)
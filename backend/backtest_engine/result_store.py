@@ -0,0 +1,144 @@
+"""
+Backtest Result Store: finished backtests persisted on disk, content-addressed by a hash of the
+request (tickers, dates, risk settings), the result-affecting config values and ENGINE_VERSION.
+Layout: <root>/<key>/date.npy (datetime64[ns]), col<k>.npy (float64 per column), meta.json
+(column names + JSON payload such as metrics and decision logs). Entries are written to a
+temporary directory and renamed into place; total size is bounded by evicting the least
+recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .. import config as cfg
+
+
+# Config settings that change backtest results. Storage locations (*_DIR) and cache / memory
+# bounds (*_MAX_BYTES, *_MAX_GROUPS) do not, so moving a store keeps its entries valid.
+RESULT_SETTINGS = (
+    "DATA_SOURCE",
+    "SYNTHETIC_MODEL",
+    "RISK_LEVELS",
+    "VOL_TARGET",
+    "MAX_DRAWDOWN_LIMIT",
+    "EXPOSURE_FLOOR",
+    "VOL_THRESHOLD",
+    "DRAWDOWN_THRESHOLD",
+    "VAR_CONFIDENCE",
+    "VAR_WINDOW",
+    "VAR_METHOD",
+    "VAR_MC_PATHS",
+    "INITIAL_CAPITAL",
+    "REBALANCE_FREQUENCY",
+    "TRANSACTION_COST",
+    "SHARPE_SUSPICIOUS",
+    "CALMAR_SUSPICIOUS",
+)
+
+
+def config_values() -> Dict[str, Any]:
+    """The RESULT_SETTINGS values of the current config."""
+    return {name: getattr(cfg, name) for name in RESULT_SETTINGS}
+
+
+def result_key(request: Dict[str, Any]) -> str:
+    """Content address of a backtest: request fields + RESULT_SETTINGS values + ENGINE_VERSION."""
+    payload = {"engine_version": cfg.ENGINE_VERSION, "config": config_values(), "request": request}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class BacktestResultStore:
+    """
+    put(key, frame, payload) stores a dated float frame (e.g. equity curves) and a JSON payload;
+    get(key) -> (frame, payload) or None. Reads are memory-mapped; a hit marks the entry as
+    recently used. Entries beyond max_bytes in total are evicted, oldest use first.
+    """
+
+    def __init__(self, root: str, max_bytes: int = cfg.BACKTEST_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        directory = os.path.join(self.root, key)
+        meta_path = os.path.join(directory, "meta.json")
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            dates = np.load(os.path.join(directory, "date.npy"), mmap_mode="r")
+            columns = {
+                name: np.load(os.path.join(directory, f"col{k}.npy"), mmap_mode="r")
+                for k, name in enumerate(meta["columns"])
+            }
+        except (OSError, ValueError, KeyError):
+            # Missing, partially evicted or unreadable: treat as a miss.
+            return None
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        frame = pd.DataFrame(columns, index=pd.DatetimeIndex(np.asarray(dates)), columns=meta["columns"])
+        return frame, meta["payload"]
+
+    def put(self, key: str, frame: pd.DataFrame, payload: Dict[str, Any]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        directory = os.path.join(self.root, key)
+        tmp = os.path.join(self.root, f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        os.makedirs(tmp, exist_ok=True)
+        try:
+            np.save(os.path.join(tmp, "date.npy"), pd.DatetimeIndex(frame.index).values.astype("datetime64[ns]"))
+            for k, name in enumerate(frame.columns):
+                np.save(os.path.join(tmp, f"col{k}.npy"), frame[name].to_numpy(dtype=np.float64))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({"columns": [str(c) for c in frame.columns], "payload": payload}, f, default=_json_default)
+            with self._lock:
+                if os.path.isdir(directory):
+                    shutil.rmtree(directory, ignore_errors=True)
+                try:
+                    os.replace(tmp, directory)
+                except OSError:
+                    pass  # written concurrently by another process: same key, same content
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                directory = os.path.join(self.root, name)
+                if name.startswith(".") or not os.path.isdir(directory):
+                    continue
+                try:
+                    size = sum(e.stat().st_size for e in os.scandir(directory) if e.is_file())
+                    used = os.path.getmtime(os.path.join(directory, "meta.json"))
+                except OSError:
+                    size, used = 0, 0.0
+                entries.append((used, size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+# Process-wide store used by the API.
+backtest_result_store = BacktestResultStore(cfg.BACKTEST_STORE_DIR)
@@ -6,20 +6,27 @@ import pandas as pd
 import numpy as np
 from typing import Callable, Dict, List, Optional, Tuple
 
+from .context import BacktestContext
+from .kernel import advance, simulate, turnover
 from .metrics import backtest_metrics, flag_suspicious
+from .multi import MultiStrategyBacktest
+from .schedule import rebalance_indices, weight_series
 
 
 class BacktestEngine:
     """
     Simulates portfolio over returns using an allocation function.
-    allocation_function(i, equity_curve_so_far) -> dict of weights.
-    equity_curve_so_far is Series of portfolio value up to (not including) day i.
+    allocation_function(i, context) -> dict of weights, or an array aligned with
+    returns.columns (e.g. a row of AllocationEngine.get_weight_matrix).
+    context is a BacktestContext over portfolio value up to (not including) day i
+    (context.series() for a Series).
+    run_weights() skips the callback for a precomputed weight matrix.
     """
 
     def __init__(
         self,
         returns: pd.DataFrame,
-        allocation_function: Callable,  # (i, equity_curve_so_far) -> dict
+        allocation_function: Callable,  # (i, context) -> dict
         rebalance_frequency: int = 21,
         transaction_cost: float = 0.0005,
         initial_capital: float = 1_000_000,
@@ -30,29 +37,54 @@ class BacktestEngine:
         self.transaction_cost = transaction_cost
         self.initial_capital = initial_capital
         self.weights_history: List[Tuple[pd.Timestamp, pd.Series]] = []
+        self.turnover: Optional[pd.Series] = None
+        self.costs: Optional[pd.Series] = None
 
     def run(self) -> pd.Series:
-        """Returns equity curve (Series)."""
+        """
+        Returns equity curve (Series). allocation_function runs on rebalance days only; the days
+        in between are advanced by the NumPy kernel. Turnover and transaction cost per day are
+        left in self.turnover / self.costs.
+        """
         dates = self.returns.index
-        portfolio_value = pd.Series(index=dates, dtype=float)
-        portfolio_value.iloc[0] = self.initial_capital
-        current_weights = None
-        previous_weights = pd.Series(0.0, index=self.returns.columns)
+        columns = self.returns.columns
+        values = np.ascontiguousarray(self.returns.to_numpy(dtype=float))
+        n_days = len(dates)
+        equity = np.full(n_days, float(self.initial_capital))
+        turnovers = np.zeros(n_days)
+        costs = np.zeros(n_days)
+        previous_weights = np.zeros(len(columns))
+        context = BacktestContext(index=dates, buffer=equity)
 
-        for i in range(1, len(dates)):
-            equity_so_far = portfolio_value.iloc[:i]
-            if i % self.rebalance_frequency == 0 or current_weights is None:
-                raw = self.allocation_function(i, equity_so_far)
-                current_weights = pd.Series(raw).reindex(self.returns.columns).fillna(0)
-                self.weights_history.append((dates[i], current_weights.copy()))
-                turnover = (current_weights - previous_weights).abs().sum()
-                cost = self.transaction_cost * turnover
-                previous_weights = current_weights.copy()
-            else:
-                cost = 0
-            daily_ret = (current_weights * self.returns.iloc[i]).sum()
-            portfolio_value.iloc[i] = portfolio_value.iloc[i - 1] * (1 + daily_ret - cost)
-        return portfolio_value
+        days = rebalance_indices(n_days, self.rebalance_frequency)
+        for k, start in enumerate(days):
+            stop = days[k + 1] if k + 1 < len(days) else n_days
+            current_weights = weight_series(self.allocation_function(start, context.advance_to(start)), columns)
+            self.weights_history.append((dates[start], current_weights.copy()))
+            weights = current_weights.to_numpy(dtype=float)
+            turnovers[start] = turnover(weights, previous_weights)
+            costs[start] = self.transaction_cost * turnovers[start]
+            advance(equity, values, weights, start, stop, costs[start])
+            previous_weights = weights
+
+        self.turnover = pd.Series(turnovers, index=dates)
+        self.costs = pd.Series(costs, index=dates)
+        return pd.Series(equity, index=dates)
+
+    def run_weights(self, weights: np.ndarray) -> pd.Series:
+        """
+        run() for precomputed weights (R x N, one row per rebalance_indices day, columns as
+        returns): no allocation callback, the whole curve in one kernel pass.
+        """
+        dates = self.returns.index
+        days = rebalance_indices(len(dates), self.rebalance_frequency)
+        result = simulate(self.returns.to_numpy(dtype=float), days, weights, self.transaction_cost, self.initial_capital)
+        self.weights_history = [
+            (dates[day], pd.Series(row, index=self.returns.columns)) for day, row in zip(days, np.asarray(weights, dtype=float))
+        ]
+        self.turnover = pd.Series(result.turnover, index=dates)
+        self.costs = pd.Series(result.cost, index=dates)
+        return pd.Series(result.equity, index=dates)
 
 
 def run_backtest_with_and_without_risk(
@@ -64,13 +96,18 @@ def run_backtest_with_and_without_risk(
     initial_capital: float = 1_000_000,
 ) -> Tuple[pd.Series, pd.Series, Dict, Dict]:
     """
-    Run two backtests (with risk engine, without). Return (equity_with, equity_without, metrics_with, metrics_without).
-    Allocation functions must have signature (i, equity_curve_so_far).
+    Run two backtests (with risk engine, without) in one pass. Return (equity_with, equity_without, metrics_with, metrics_without).
+    Allocation functions must have signature (i, context).
     """
-    bt_with = BacktestEngine(returns, allocation_fn_with_risk, rebalance_frequency, transaction_cost, initial_capital)
-    bt_no = BacktestEngine(returns, allocation_fn_no_risk, rebalance_frequency, transaction_cost, initial_capital)
-    equity_with = bt_with.run()
-    equity_no = bt_no.run()
+    bt = MultiStrategyBacktest(
+        returns,
+        {"with_risk": allocation_fn_with_risk, "without_risk": allocation_fn_no_risk},
+        rebalance_frequency,
+        transaction_cost,
+        initial_capital,
+    )
+    equity = bt.run()
+    equity_with, equity_no = equity["with_risk"], equity["without_risk"]
     metrics_with = flag_suspicious(backtest_metrics(equity_with))
     metrics_no = flag_suspicious(backtest_metrics(equity_no))
     return equity_with, equity_no, metrics_with, metrics_no
@@ -0,0 +1,20 @@
+"""
+Backtest Schedule: rebalance days and allocation outputs as weight vectors, shared by the
+single-strategy runner, the multi-strategy backtest, the sweep and Monte Carlo.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def rebalance_indices(n_days: int, rebalance_frequency: int) -> np.ndarray:
+    """Day indices where BacktestEngine.run rebalances: day 1, then every multiple of rebalance_frequency."""
+    days = np.arange(rebalance_frequency, n_days, rebalance_frequency)
+    return days if n_days < 2 or (len(days) and days[0] == 1) else np.concatenate(([1], days))
+
+
+def weight_series(raw, columns: pd.Index) -> pd.Series:
+    """Allocation function output (dict, or array aligned with columns) as a Series over columns."""
+    if isinstance(raw, np.ndarray):
+        return pd.Series(raw, index=columns, dtype=float)
+    return pd.Series(raw).reindex(columns).fillna(0)
@@ -0,0 +1,285 @@
+"""
+Parameter Sweep: regime-allocation backtests over a grid or random sample of risk / rebalance /
+cost settings, fanned out across a process pool. Returns and regime codes are placed once in
+shared memory and attached by every worker (no per-task copies); configurations are sent in
+chunks and results stream back into a results table (parameters + batch_metrics per row).
+Per worker, base weights and portfolio variance are computed once per rebalance frequency;
+each configuration then costs one vectorized risk overlay and one kernel pass.
+"""
+
+import itertools
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .. import config as cfg
+from ..allocation_engine.allocator import AllocationEngine
+from ..risk_engine.engine import RiskEngine
+from .context import BacktestContext
+from .kernel import advance, turnover
+from .metrics import batch_metrics
+from .schedule import rebalance_indices
+
+SWEEP_PARAMS = (
+    "with_risk",
+    "vol_target",
+    "max_drawdown_limit",
+    "exposure_floor",
+    "rebalance_frequency",
+    "transaction_cost",
+)
+
+# Per-process data set once by _init_worker (arrays are views of the parent's shared memory).
+_worker: Dict[str, Any] = {}
+
+
+def parameter_grid(**axes: Sequence) -> List[Dict[str, Any]]:
+    """Cartesian product of axes, e.g. parameter_grid(risk_level=["LOW", "HIGH"], rebalance_frequency=[5, 21])."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def random_configs(space: Dict[str, Any], n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    n random configurations. space values: a list (uniform choice), a (low, high) tuple of floats
+    (uniform) or of ints (uniform integer, inclusive), or a constant.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            columns[name] = [spec[k] for k in rng.integers(0, len(spec), n)]
+        elif isinstance(spec, tuple) and all(isinstance(v, (int, np.integer)) for v in spec):
+            columns[name] = rng.integers(spec[0], spec[1] + 1, n).tolist()
+        elif isinstance(spec, tuple):
+            columns[name] = rng.uniform(spec[0], spec[1], n).tolist()
+        else:
+            columns[name] = [spec] * n
+    return [{name: values[k] for name, values in columns.items()} for k in range(n)]
+
+
+def resolve_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Full parameter set: config defaults, then the risk_level preset, then explicit values."""
+    params = {
+        "with_risk": True,
+        "vol_target": cfg.VOL_TARGET,
+        "max_drawdown_limit": cfg.MAX_DRAWDOWN_LIMIT,
+        "exposure_floor": cfg.EXPOSURE_FLOOR,
+        "rebalance_frequency": cfg.REBALANCE_FREQUENCY,
+        "transaction_cost": cfg.TRANSACTION_COST,
+    }
+    level = config.get("risk_level")
+    if level is not None:
+        if level not in cfg.RISK_LEVELS:
+            raise ValueError(f"Unknown risk level: {level}")
+        params.update(cfg.RISK_LEVELS[level])
+    unknown = set(config) - set(SWEEP_PARAMS) - {"risk_level"}
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    params.update({k: v for k, v in config.items() if k != "risk_level"})
+    params["rebalance_frequency"] = int(params["rebalance_frequency"])
+    params["with_risk"] = bool(params["with_risk"])
+    if level is not None:
+        params["risk_level"] = level
+    return params
+
+
+def _attach(name: str, shape: Tuple[int, ...], dtype: str) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    try:
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: registers again with the owner's (inherited) resource tracker, a no-op
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(layout: Dict[str, Any], dates: pd.Index, columns: pd.Index, vol_window: int) -> None:
+    """layout: name -> (shared memory name, shape, dtype), or the array itself when in-process."""
+    _worker.clear()
+    handles = {
+        key: (None, spec) if isinstance(spec, np.ndarray) else _attach(*spec) for key, spec in layout.items()
+    }
+    values, codes = handles["returns"][1], handles["regime_codes"][1]
+    returns = pd.DataFrame(values, index=dates, columns=columns, copy=False)
+    _worker.update(
+        handles=handles,  # keep the mappings alive
+        values=values,
+        regime_codes=codes,
+        returns=returns,
+        templates=AllocationEngine(list(columns)).regime_templates,
+        risk=RiskEngine(returns, vol_window=vol_window),
+        schedules={},
+    )
+
+
+def _schedule(freq: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rebalance days, base weights R x N, portfolio variance per row) for a frequency, cached."""
+    schedules = _worker["schedules"]
+    if freq not in schedules:
+        days = rebalance_indices(len(_worker["values"]), freq)
+        base = _worker["templates"][_worker["regime_codes"][days]]
+        schedules[freq] = (days, base, _worker["risk"].portfolio_variance(base, days))
+    return schedules[freq]
+
+
+def _run_config(params: Dict[str, Any]) -> np.ndarray:
+    """Equity curve of one configuration (same rules as the CoreEngine regime backtest)."""
+    values = _worker["values"]
+    days, weights, variance = _schedule(params["rebalance_frequency"])
+    with_risk = params["with_risk"]
+    if with_risk:
+        risk = _worker["risk"]
+        risk.vol_target = params["vol_target"]
+        weights, _ = risk.apply_matrix(weights, days, portfolio_variance=variance)
+    n_days = len(values)
+    equity = np.full(n_days, float(cfg.INITIAL_CAPITAL))
+    context = BacktestContext(buffer=equity)
+    previous = np.zeros(values.shape[1])
+    for k, start in enumerate(days):
+        stop = days[k + 1] if k + 1 < len(days) else n_days
+        row = weights[k]
+        # Drawdown protection depends on the path so far: applied at each rebalance.
+        if with_risk and context.advance_to(start).drawdown < params["max_drawdown_limit"]:
+            row = row * params["exposure_floor"]
+        cost = params["transaction_cost"] * turnover(row, previous)
+        advance(equity, values, row, start, stop, cost)
+        previous = row
+    return equity
+
+
+def _run_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, float]]]:
+    equity = np.stack([_run_config(params) for _, params in chunk])
+    metrics = batch_metrics(equity, index=_worker["returns"].index)
+    return [(k, row) for (k, _), row in zip(chunk, metrics.to_dict(orient="records"))]
+
+
+class SweepEngine:
+    """
+    run(configs) -> results table (one row per finished configuration: config_id, parameters,
+    metrics). Configurations are dicts of SWEEP_PARAMS and/or risk_level (see resolve_config).
+    progress / results() can be read from another thread while run() works; cancel() stops
+    after the chunks in flight; an exception raised by run() is kept in progress["error"].
+    max_workers <= 1 runs in-process.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        regime_codes: np.ndarray,
+        vol_window: int = 21,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 32,
+    ):
+        self.returns = returns
+        self.regime_codes = np.asarray(regime_codes, dtype=np.int8)
+        self.vol_window = vol_window
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._rows: List[Dict[str, Any]] = []
+        self._total = 0
+        self._running = False
+        self._error: Optional[str] = None
+
+    @property
+    def progress(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "done": len(self._rows),
+                "total": self._total,
+                "running": self._running,
+                "cancelled": self._cancel.is_set(),
+                "error": self._error,
+            }
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def results(self) -> pd.DataFrame:
+        """Finished configurations so far, ordered by config_id."""
+        with self._lock:
+            rows = list(self._rows)
+        if not rows:
+            return pd.DataFrame(columns=["config_id", *SWEEP_PARAMS])
+        return pd.DataFrame(rows).sort_values("config_id", kind="stable").reset_index(drop=True)
+
+    def run(
+        self,
+        configs: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> pd.DataFrame:
+        with self._lock:
+            self._rows = []
+            self._total = len(configs)
+            self._running = True
+            self._error = None
+        self._cancel.clear()
+        try:
+            resolved = [resolve_config(c) for c in configs]
+            self._run(resolved, on_result)
+        except Exception as e:
+            with self._lock:
+                self._error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            with self._lock:
+                self._running = False
+        return self.results()
+
+    def _run(
+        self,
+        resolved: List[Dict[str, Any]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> None:
+        tasks = list(enumerate(resolved))
+        chunks = [tasks[a : a + self.chunk_size] for a in range(0, len(tasks), self.chunk_size)]
+
+        def collect(done: List[Tuple[int, Dict[str, float]]]) -> None:
+            for k, metrics in done:
+                row = {"config_id": k, **resolved[k], **metrics}
+                with self._lock:
+                    self._rows.append(row)
+                if on_result:
+                    on_result(row)
+
+        arrays = {
+            "returns": np.ascontiguousarray(self.returns.to_numpy(dtype=float)),
+            "regime_codes": self.regime_codes,
+        }
+        workers = min(self.max_workers or os.cpu_count() or 1, len(chunks))
+        segments: List[shared_memory.SharedMemory] = []
+        try:
+            if workers <= 1:
+                _init_worker(arrays, self.returns.index, self.returns.columns, self.vol_window)
+                for chunk in chunks:
+                    if self._cancel.is_set():
+                        break
+                    collect(_run_chunk(chunk))
+            else:
+                layout = {}
+                for key, array in arrays.items():
+                    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                    segments.append(shm)
+                    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+                    layout[key] = (shm.name, array.shape, array.dtype.str)
+                init_args = (layout, self.returns.index, self.returns.columns, self.vol_window)
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                    pending = iter(chunks)
+                    # Keep two chunks per worker in flight so cancel() takes effect quickly.
+                    futures = {pool.submit(_run_chunk, c) for c in itertools.islice(pending, 2 * workers)}
+                    while futures:
+                        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future.result())
+                        if not self._cancel.is_set():
+                            futures |= {pool.submit(_run_chunk, c) for c in itertools.islice(pending, len(done))}
+        finally:
+            _worker.clear()
+            for shm in segments:
+                shm.close()
+                shm.unlink()
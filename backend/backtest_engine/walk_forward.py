@@ -0,0 +1,167 @@
+"""
+Walk-forward backtest: refit the regime model on each training window, then trade the
+following test window out-of-sample. Folds run in parallel in a process pool; each worker
+receives the shared market data once (pool initializer) and folds are plain index ranges.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .. import config as cfg
+from ..allocation_engine.allocator import AllocationEngine
+from ..data_engine.splits import WalkForwardSplit, walk_forward_splits
+from ..regime_engine.detector import RegimeEngine, codes_to_series
+from ..risk_engine.engine import RiskEngine
+from .context import BacktestContext
+from .metrics import backtest_metrics, flag_suspicious
+from .runner import BacktestEngine
+
+# Per-process data set once by _init_worker (never re-sent per fold).
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(
+    returns: pd.DataFrame,
+    volatility: np.ndarray,
+    drawdown: np.ndarray,
+    trend_signal: np.ndarray,
+    params: Dict[str, Any],
+) -> None:
+    _worker.clear()
+    _worker.update(
+        returns=returns,
+        volatility=volatility,
+        drawdown=drawdown,
+        trend_signal=trend_signal,
+        params=params,
+        allocator=AllocationEngine(list(returns.columns)),
+        risk=RiskEngine(
+            returns,
+            vol_target=params["vol_target"],
+            max_drawdown_limit=params["max_drawdown_limit"],
+            exposure_floor=params["exposure_floor"],
+            enabled=params["with_risk"],
+            vol_window=params["vol_window"],
+        ),
+    )
+
+
+def _run_fold(split: WalkForwardSplit) -> Tuple[int, np.ndarray, np.ndarray]:
+    """Fit regimes on the train rows, trade the test rows. Returns (fold, equity from 1.0, regime codes)."""
+    returns = _worker["returns"]
+    vol, dd, trend = _worker["volatility"], _worker["drawdown"], _worker["trend_signal"]
+    params = _worker["params"]
+    allocator, risk = _worker["allocator"], _worker["risk"]
+
+    regime_engine = RegimeEngine(params["vol_threshold"], params["drawdown_threshold"])
+    regime_engine.fit(split.train(vol), split.train(dd), split.train(trend))
+    # Start from the last training day so the first test day's return is earned.
+    lo, hi = split.test_start - 1, split.test_end
+    regimes = regime_engine.predict_codes(vol[lo:hi], dd[lo:hi], trend[lo:hi])
+
+    def allocation_function(i: int, context: Optional[BacktestContext] = None) -> Dict[str, float]:
+        g = lo + i
+        base_weights = allocator.get_weights(regimes[i])
+        return risk.apply(
+            base_weights, g, last_returns=returns.iloc[g - 1],
+            drawdown=context.tracker if context is not None else None,
+        )
+
+    bt = BacktestEngine(
+        returns.iloc[lo:hi],
+        allocation_function,
+        params["rebalance_frequency"],
+        params["transaction_cost"],
+        1.0,
+    )
+    return split.fold, bt.run().to_numpy(), regimes
+
+
+def run_walk_forward(
+    returns: pd.DataFrame,
+    volatility: pd.DataFrame,
+    drawdown: pd.DataFrame,
+    trend_signal: pd.DataFrame,
+    train_window: int = cfg.TRAIN_WINDOW,
+    test_window: int = cfg.TEST_WINDOW,
+    with_risk: bool = True,
+    vol_target: float = cfg.VOL_TARGET,
+    max_drawdown_limit: float = cfg.MAX_DRAWDOWN_LIMIT,
+    exposure_floor: float = cfg.EXPOSURE_FLOOR,
+    vol_window: int = 21,
+    rebalance_frequency: int = cfg.REBALANCE_FREQUENCY,
+    transaction_cost: float = cfg.TRANSACTION_COST,
+    initial_capital: float = cfg.INITIAL_CAPITAL,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Out-of-sample walk-forward backtest. Fold equity curves are chained into one curve
+    starting at the first fold's last training day. Drawdown protection sees each fold's
+    own equity (folds are independent so they can run in parallel).
+    Returns {"equity", "regimes", "metrics", "folds"}.
+    """
+    params = dict(
+        with_risk=with_risk,
+        vol_target=vol_target,
+        max_drawdown_limit=max_drawdown_limit,
+        exposure_floor=exposure_floor,
+        vol_window=vol_window,
+        vol_threshold=cfg.VOL_THRESHOLD,
+        drawdown_threshold=cfg.DRAWDOWN_THRESHOLD,
+        rebalance_frequency=rebalance_frequency,
+        transaction_cost=transaction_cost,
+    )
+    init_args = (
+        returns,
+        volatility.to_numpy(dtype=float),
+        drawdown.to_numpy(dtype=float),
+        trend_signal.to_numpy(dtype=float),
+        params,
+    )
+    splits = list(walk_forward_splits(len(returns), train_window, test_window))
+    if not splits:
+        raise ValueError("Not enough history for one walk-forward fold.")
+
+    workers = min(max_workers or os.cpu_count() or 1, len(splits))
+    if workers <= 1:
+        _init_worker(*init_args)
+        results = [_run_fold(split) for split in splits]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+            results = list(pool.map(_run_fold, splits))
+    results.sort(key=lambda r: r[0])
+
+    dates = returns.index
+    values: List[float] = []
+    regimes: List[np.ndarray] = []
+    folds = []
+    level = initial_capital
+    for split, (_, fold_equity, fold_regimes) in zip(splits, results):
+        segment = level * fold_equity / fold_equity[0]
+        lo = split.test_start - 1
+        fold_series = pd.Series(segment, index=dates[lo : split.test_end])
+        # The anchor day duplicates the previous fold's last day.
+        skip = 0 if not values else 1
+        values.extend(segment[skip:])
+        regimes.append(fold_regimes[skip:])
+        level = segment[-1]
+        folds.append({
+            "fold": split.fold,
+            "train_start": str(dates[split.train_start])[:10],
+            "test_start": str(dates[split.test_start])[:10],
+            "test_end": str(dates[split.test_end - 1])[:10],
+            "metrics": backtest_metrics(fold_series),
+        })
+
+    index = dates[splits[0].test_start - 1 : splits[-1].test_end]
+    equity = pd.Series(values, index=index)
+    return {
+        "equity": equity,
+        "regimes": codes_to_series(np.concatenate(regimes), index),
+        "metrics": flag_suspicious(backtest_metrics(equity)),
+        "folds": folds,
+    }
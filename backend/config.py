@@ -1,11 +1,36 @@
 """Central configuration for the portfolio engine."""
 
+import os
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Market data (source: yfinance | csv | synthetic; store caches prices on disk)
+DATA_SOURCE = os.environ.get("PORTFOLIO_DATA_SOURCE", "yfinance")
+CSV_DATA_DIR = os.environ.get("PORTFOLIO_CSV_DIR", os.path.join(_PROJECT_ROOT, "data", "csv"))
+SYNTHETIC_MODEL = os.environ.get("PORTFOLIO_SYNTHETIC_MODEL", "gbm")  # gbm | regime
+PRICE_STORE_DIR = os.environ.get("PORTFOLIO_PRICE_STORE", os.path.join(_PROJECT_ROOT, "data", "prices"))
+FEATURE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+REGIME_MODEL_DIR = os.environ.get("PORTFOLIO_MODEL_STORE", os.path.join(_PROJECT_ROOT, "data", "models"))
+REGIME_MODEL_MAX_GROUPS = 64  # one group per (clustering params, first feature row)
+# Backtest results on disk, keyed by request + config + ENGINE_VERSION (bump it when engine results change)
+ENGINE_VERSION = "1"
+BACKTEST_STORE_DIR = os.environ.get("PORTFOLIO_BACKTEST_STORE", os.path.join(_PROJECT_ROOT, "data", "backtests"))
+BACKTEST_STORE_MAX_BYTES = 256 * 1024 * 1024
+
 # Risk
 VOL_TARGET = 0.15
 MAX_DRAWDOWN_LIMIT = -0.20
 EXPOSURE_FLOOR = 0.2
 VOL_THRESHOLD = 0.25
 DRAWDOWN_THRESHOLD = -0.15
+# RiskEngine keeps the full rolling covariance tensor (T x N x N) up to this size;
+# larger universes compute each rebalance day's covariance row on demand.
+RISK_COV_TENSOR_MAX_BYTES = 256 * 1024 * 1024
+# Tail risk (VaR / CVaR): confidence, lookback window (days), default method, Monte Carlo paths
+VAR_CONFIDENCE = 0.95
+VAR_WINDOW = 252
+VAR_METHOD = "historical"  # historical | gaussian | cornish_fisher | monte_carlo
+VAR_MC_PATHS = 10_000
 
 # Backtest
 INITIAL_CAPITAL = 1_000_000
@@ -13,6 +38,13 @@ REBALANCE_FREQUENCY = 21
 TRANSACTION_COST = 0.0005
 TRAIN_WINDOW = 756
 TEST_WINDOW = 126
+# Monte Carlo backtests: resampled paths, mean stationary-bootstrap block length (days)
+MONTE_CARLO_PATHS = 1_000
+MONTE_CARLO_BLOCK_SIZE = 21
+# Request bounds, and how many paths (at most) the equity percentile bands are taken from
+MONTE_CARLO_MAX_PATHS = 100_000
+MONTE_CARLO_MAX_DAYS = 252 * 50
+MONTE_CARLO_BAND_PATHS = 2_000
 
 # Suspicious metrics (flag if exceeded)
 SHARPE_SUSPICIOUS = 3.0
@@ -5,18 +5,51 @@ Used for both one-shot backtest and for real-time simulation (1 sec = 1 day).
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 
 from . import config as cfg
-from .data_engine import DataEngine
-from .regime_engine import RegimeEngine
-from .allocation_engine import AllocationEngine
-from .risk_engine import RiskEngine
+from .data_engine import DataEngine, LazyFeatures, RollingCovariance, feature_cache
+from .regime_engine import (
+    REGIME_LABELS,
+    OnlineRegimeDetector,
+    RegimeEngine,
+    codes_to_series,
+    regime_code,
+    regime_model_store,
+)
+from .allocation_engine import ALLOCATION_METHODS, AllocationEngine
+from .risk_engine import (
+    FLAG_DRAWDOWN,
+    FLAG_VAR_LIMIT,
+    FLAG_VOL_TARGET,
+    DrawdownTracker,
+    RiskEngine,
+    VaREngine,
+    flag_names,
+    get_covariance_model,
+)
 from .explainability_engine import ExplainabilityEngine
-from .backtest_engine import BacktestEngine, backtest_metrics, flag_suspicious
+from .backtest_engine import (
+    BacktestContext,
+    BacktestEngine,
+    MonteCarloBacktest,
+    MultiStrategyBacktest,
+    StrategySpec,
+    SweepEngine,
+    backtest_metrics,
+    flag_suspicious,
+    rebalance_indices,
+    result_key,
+    run_walk_forward,
+)
 from .portfolio_state import PortfolioState
 
 
+def check_allocation_method(method: str) -> None:
+    if method not in ALLOCATION_METHODS:
+        raise ValueError(f"Unknown allocation method: {method} (expected one of {', '.join(ALLOCATION_METHODS)})")
+
+
 class CoreEngine:
     """
     Single engine: load data, compute features, regime, allocation (with/without risk), log decisions.
@@ -29,12 +62,27 @@ class CoreEngine:
         end_date: str,
         risk_level: str = "MEDIUM",
         vol_window: int = 21,
+        use_cache: bool = True,
+        regime_mode: str = "batch",  # "batch" (fit on full sample) | "online" (per-day causal detector)
+        per_asset_regimes: bool = False,
+        regime_groups: Optional[Dict[str, str]] = None,  # ticker -> sector group (per-asset mode)
+        allocation_method: str = "regime",  # "regime" | "risk_parity" | "inverse_vol" | "momentum" | "equal"
+        covariance_model: Optional[str] = None,  # None (sample) | "ledoit_wolf" | "ewma" | "pca"
+        var_limit: Optional[float] = None,  # max daily VaR (cfg.VAR_METHOD / VAR_CONFIDENCE) as a sizing constraint
     ):
+        check_allocation_method(allocation_method)
         self.tickers = tickers
         self.start_date = start_date
         self.end_date = end_date
         self.risk_level = risk_level
         self.vol_window = vol_window
+        self.use_cache = use_cache
+        self.regime_mode = regime_mode
+        self.per_asset_regimes = per_asset_regimes
+        self.regime_groups = regime_groups
+        self.allocation_method = allocation_method
+        self.covariance_model = covariance_model
+        self.var_limit = var_limit
         risk_params = cfg.RISK_LEVELS.get(risk_level, cfg.RISK_LEVELS["MEDIUM"])
         self.vol_target = risk_params["vol_target"]
         self.max_drawdown_limit = risk_params["max_drawdown_limit"]
@@ -45,27 +93,79 @@ class CoreEngine:
         self.allocation_engine: Optional[AllocationEngine] = None
         self.risk_engine: Optional[RiskEngine] = None
         self.explainability: Optional[ExplainabilityEngine] = None
-        self.regime_series: Optional[pd.Series] = None
-        self.features: Optional[Dict] = None
+        self.regime_codes: Optional[np.ndarray] = None  # int8, REGIME_LABELS[code]
+        self.regime_series: Optional[pd.Series] = None  # categorical, for display
+        self.asset_regime_codes: Optional[np.ndarray] = None  # T x N int8 (per_asset_regimes)
+        self.features: Optional[LazyFeatures] = None
         self.returns: Optional[pd.DataFrame] = None
         self.prices: Optional[pd.DataFrame] = None
+        self.rolling_cov: Optional[RollingCovariance] = None  # lazy; rows read on demand
+        self._base_plans: Dict[str, Dict[int, np.ndarray]] = {}  # method -> day -> base weights
+
+    def result_key(self) -> str:
+        """Content address of this engine's backtest results (see backtest_engine.result_store)."""
+        return result_key({
+            "tickers": list(self.tickers),
+            "start_date": str(pd.Timestamp(self.start_date).date()),
+            "end_date": str(pd.Timestamp(self.end_date).date()),
+            "risk_level": self.risk_level,
+            "vol_window": self.vol_window,
+            "regime_mode": self.regime_mode,
+            "per_asset_regimes": self.per_asset_regimes,
+            "regime_groups": self.regime_groups,
+            "allocation_method": self.allocation_method,
+            "covariance_model": self.covariance_model,
+            "var_limit": self.var_limit,
+        })
 
     def load_and_prepare(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Load data and compute features. Returns (prices, returns)."""
-        self.data_engine = DataEngine(
+        """
+        Load data and compute features. Returns (prices, returns).
+        Prepared data is shared through the process-wide feature cache when use_cache is set.
+        """
+        data_engine = DataEngine(
             self.tickers, self.start_date, self.end_date, vol_window=self.vol_window
         )
-        self.prices, self.returns = self.data_engine.load()
-        self.features = self.data_engine.get_features()
+
+        def _load() -> DataEngine:
+            data_engine.load()
+            return data_engine
+
+        if self.use_cache:
+            data_engine = feature_cache.get_or_load(data_engine.cache_key, _load)
+        else:
+            _load()
+        self.data_engine = data_engine
+        self.prices = data_engine.get_prices()
+        self.returns = data_engine.get_returns()
+        self.features = data_engine.get_features()
+        self.rolling_cov = data_engine.rolling_covariance()
         self.regime_engine = RegimeEngine(
             vol_threshold=cfg.VOL_THRESHOLD,
             drawdown_threshold=cfg.DRAWDOWN_THRESHOLD,
+            model_store=regime_model_store,
         )
-        self.regime_series = self.regime_engine.generate_regime_series(
-            self.features["volatility"],
-            self.features["drawdown"],
-            self.features["trend_signal"],
-        )
+        if self.regime_mode == "online":
+            feature_matrix = self.regime_engine.feature_matrix(
+                self.features["volatility"],
+                self.features["drawdown"],
+                self.features["trend_signal"],
+            )
+            self.regime_codes = self.new_online_detector().run(feature_matrix)
+        else:
+            self.regime_codes = self.regime_engine.generate_regime_codes(
+                self.features["volatility"],
+                self.features["drawdown"],
+                self.features["trend_signal"],
+            )
+        self.regime_series = codes_to_series(self.regime_codes, self.returns.index)
+        if self.per_asset_regimes:
+            self.asset_regime_codes = self.regime_engine.generate_asset_regime_codes(
+                self.features["volatility"],
+                self.features["drawdown"],
+                self.features["trend_signal"],
+                groups=self.regime_groups,
+            )
         self.allocation_engine = AllocationEngine(self.tickers)
         self.risk_engine = RiskEngine(
             self.returns,
@@ -74,40 +174,153 @@ class CoreEngine:
             exposure_floor=self.exposure_floor,
             enabled=True,
             vol_window=self.vol_window,
+            covariance_model=self.covariance_model,
+            rolling_cov=data_engine.rolling_covariance(self.vol_window),
+            var_limit=self.var_limit,
         )
         self.explainability = ExplainabilityEngine()
+        self._base_plans = {}
         return self.prices, self.returns
 
-    def build_allocation_function(self, with_risk: bool = True):
-        """Returns allocation_function(i, equity_curve_so_far) -> weights dict, and logs decisions."""
+    def new_online_detector(self) -> OnlineRegimeDetector:
+        return OnlineRegimeDetector(
+            vol_threshold=cfg.VOL_THRESHOLD,
+            drawdown_threshold=cfg.DRAWDOWN_THRESHOLD,
+        )
+
+    def risk_engine_for(self, risk_level: str) -> RiskEngine:
+        """
+        RiskEngine with the presets of risk_level (self.risk_engine for this engine's own level),
+        sharing the rolling covariance tensor and settings of self.risk_engine.
+        """
+        if risk_level == self.risk_level:
+            return self.risk_engine
+        params = cfg.RISK_LEVELS.get(risk_level, cfg.RISK_LEVELS["MEDIUM"])
+        base = self.risk_engine
+        return RiskEngine(
+            self.returns,
+            vol_target=params["vol_target"],
+            max_drawdown_limit=params["max_drawdown_limit"],
+            exposure_floor=params["exposure_floor"],
+            enabled=True,
+            vol_window=self.vol_window,
+            covariance_model=self.covariance_model,
+            rolling_cov=base.rolling_cov,
+            var_limit=self.var_limit,
+        )
+
+    def allocation_weight_matrix(self, days: np.ndarray, method: Optional[str] = None) -> np.ndarray:
+        """
+        Base weights (R x N) of a quantitative allocation method (default allocation_method) for
+        rebalance days, in one batch.
+        Day i uses data through day i - 1 (covariance window / momentum); risk parity solves the
+        dates in order, each warm-started from the previous one.
+        """
+        days = np.asarray(days, dtype=np.intp)
+        known = np.maximum(days - 1, 0)
+        method = method or self.allocation_method
+        cov = None
+        if method == "risk_parity":
+            cov = self._covariances(known)
+        elif method == "inverse_vol":
+            cov = np.stack(list(self._covariances(known)))
+        momentum = self.features["momentum"].to_numpy(dtype=float)[known] if method == "momentum" else None
+        return self.allocation_engine.get_weight_matrix(
+            self.regime_codes[days],
+            method,
+            cov=cov,
+            momentum_scores=momentum,
+            asset_regimes=None if self.asset_regime_codes is None else self.asset_regime_codes[days],
+        )
+
+    def _covariances(self, positions: np.ndarray):
+        """Lazy N x N covariances through each row in positions (rolling sample, or covariance_model)."""
+        if self.covariance_model is None:
+            for p in positions:
+                yield self.rolling_cov.window_covariance(p)
+            return
+        model = get_covariance_model(self.covariance_model, len(self.tickers))
+        values = self.returns.to_numpy(dtype=float)
+        for p in positions:
+            yield model.advance_to(values, p + 1).covariance()
+
+    def build_allocation_function(
+        self,
+        with_risk: bool = True,
+        risk_engine: Optional[RiskEngine] = None,
+        allocation_method: Optional[str] = None,
+        explain: Optional[ExplainabilityEngine] = None,
+    ):
+        """
+        Returns allocation_function(i, context, regime=None) -> weights dict, and logs decisions.
+        context: BacktestContext of equity before day i (a Series of it is also accepted, or None).
+        regime (label or code) overrides the precomputed regime for day i, e.g. from an online detector.
+        Quantitative allocation methods are precomputed for the backtest's rebalance days, once per
+        method for all allocation functions of this engine. risk_engine, allocation_method and
+        explain default to this engine's own.
+        """
         returns = self.returns
-        regime_series = self.regime_series
+        regime_codes = self.regime_codes
+        asset_regime_codes = self.asset_regime_codes
         allocator = self.allocation_engine
-        risk_engine = self.risk_engine
-        explain = self.explainability
+        risk_engine = risk_engine or self.risk_engine
+        explain = explain or self.explainability
+        tracker = DrawdownTracker()  # for equity passed as a Series: caught up, O(new values) per call
+        method = allocation_method or self.allocation_method
+        check_allocation_method(method)
+        planned: Dict[int, np.ndarray] = {}
+        if method != "regime":
+            if method not in self._base_plans:
+                days = rebalance_indices(len(returns), cfg.REBALANCE_FREQUENCY)
+                self._base_plans[method] = dict(zip(days.tolist(), self.allocation_weight_matrix(days, method)))
+            planned = self._base_plans[method]
 
-        def allocation_function(i: int, equity_curve_so_far: Optional[pd.Series] = None) -> Dict[str, float]:
-            regime = regime_series.iloc[i]
-            base_weights = allocator.get_weights(regime)
+        def allocation_function(
+            i: int,
+            context: Optional[Union[BacktestContext, pd.Series]] = None,
+            regime: Optional[Union[str, int]] = None,
+        ) -> Dict[str, float]:
+            code = regime_codes[i] if regime is None else regime_code(regime)
+            regime = REGIME_LABELS[code]
+            if method != "regime":
+                if i not in planned:  # off-schedule call (e.g. real-time simulator)
+                    planned[i] = self.allocation_weight_matrix(np.array([i]), method)[0]
+                base_weights = dict(zip(allocator.tickers, planned[i].tolist()))
+            else:
+                base_weights = allocator.get_weights(
+                    code, asset_regimes=None if asset_regime_codes is None else asset_regime_codes[i]
+                )
+            if isinstance(context, BacktestContext):
+                drawdown = context.tracker
+            elif context is not None:
+                drawdown = tracker.sync(context)
+            else:
+                tracker.reset()
+                drawdown = tracker
             if with_risk:
                 adj_weights = risk_engine.apply(
-                    base_weights, i, equity_curve=equity_curve_so_far,
+                    base_weights, i,
                     last_returns=returns.iloc[i - 1] if i > 0 else None,
+                    drawdown=drawdown,
                 )
             else:
                 adj_weights = base_weights
             port_vol = risk_engine._portfolio_vol(adj_weights, i) if with_risk else 0
-            dd = None
-            if equity_curve_so_far is not None and len(equity_curve_so_far) > 0:
-                ec = equity_curve_so_far.dropna()
-                if len(ec) > 0 and ec.iloc[-1] > 0:
-                    cummax = ec.cummax()
-                    dd = float((ec.iloc[-1] - cummax.iloc[-1]) / cummax.iloc[-1])
+            dd = drawdown.drawdown if drawdown.n_valid > 0 and drawdown.value > 0 else None
+            flags = risk_engine.last_flags if with_risk else 0
             reason = f"Regime: {regime}"
             action = "Allocation updated"
-            if with_risk and port_vol > self.vol_target:
+            if flags & FLAG_VOL_TARGET:
                 reason += "; Vol scaled to target"
                 action = "Reduced exposure (vol targeting)"
+            if flags & FLAG_VAR_LIMIT:
+                reason += "; VaR above limit"
+                if not flags & FLAG_VOL_TARGET:
+                    action = "Reduced exposure (VaR limit)"
+            if flags & FLAG_DRAWDOWN:
+                reason += "; Drawdown limit breached"
+                if not flags & (FLAG_VOL_TARGET | FLAG_VAR_LIMIT):
+                    action = "Reduced exposure (drawdown protection)"
             if explain:
                 explain.log(
                     date=str(returns.index[i])[:10],
@@ -119,6 +332,7 @@ class CoreEngine:
                     base_allocation=base_weights,
                     drawdown=dd,
                     risk_reduced=with_risk and adj_weights != base_weights,
+                    risk_flags=flag_names(flags),
                 )
             return adj_weights
 
@@ -147,28 +361,70 @@ class CoreEngine:
         metrics = flag_suspicious(backtest_metrics(equity))
         return equity, metrics
 
-    def run_backtest_comparison(
+    def run_strategies(
         self,
+        strategies: List[StrategySpec],
+        initial_capital: float = None,
     ) -> Dict[str, Any]:
         """
-        Run backtest WITH and WITHOUT risk engine. Returns both equity curves and metrics.
+        Backtest several strategies (risk on/off, risk level, allocation method) in one pass over
+        returns. Base allocations are computed once per method, risk levels share one rolling
+        covariance, and strategies that cannot differ (no risk overlay, same method) run once.
+        Decisions are logged strategy by strategy, in order.
+        Returns {"equity": DataFrame (dates x names), "metrics": name -> metrics, "weights": name -> rebalance weights}.
         """
+        for spec in strategies:
+            check_allocation_method(spec.allocation_method)
         if self.returns is None:
             self.load_and_prepare()
-        alloc_with = self.build_allocation_function(with_risk=True)
-        alloc_no = self.build_allocation_function(with_risk=False)
-        bt_with = BacktestEngine(
-            self.returns, alloc_with,
-            cfg.REBALANCE_FREQUENCY, cfg.TRANSACTION_COST, cfg.INITIAL_CAPITAL,
-        )
-        bt_no = BacktestEngine(
-            self.returns, alloc_no,
-            cfg.REBALANCE_FREQUENCY, cfg.TRANSACTION_COST, cfg.INITIAL_CAPITAL,
+        functions: Dict[str, Any] = {}
+        logs: Dict[str, ExplainabilityEngine] = {}
+        runs: Dict[str, str] = {}  # strategy name -> name of the run that computes it
+        by_key: Dict[Tuple, str] = {}
+        for spec in strategies:
+            key = (spec.with_risk, spec.risk_level if spec.with_risk else None, spec.allocation_method)
+            if key in by_key:
+                runs[spec.name] = by_key[key]
+                continue
+            by_key[key] = runs[spec.name] = spec.name
+            logs[spec.name] = ExplainabilityEngine()
+            functions[spec.name] = self.build_allocation_function(
+                with_risk=spec.with_risk,
+                risk_engine=self.risk_engine_for(spec.risk_level) if spec.with_risk else None,
+                allocation_method=spec.allocation_method,
+                explain=logs[spec.name],
+            )
+        bt = MultiStrategyBacktest(
+            self.returns,
+            functions,
+            cfg.REBALANCE_FREQUENCY,
+            cfg.TRANSACTION_COST,
+            initial_capital or cfg.INITIAL_CAPITAL,
         )
-        equity_with = bt_with.run()
-        equity_no = bt_no.run()
-        metrics_with = flag_suspicious(backtest_metrics(equity_with))
-        metrics_no = flag_suspicious(backtest_metrics(equity_no))
+        computed = bt.run()
+        for name in functions:
+            self.explainability.extend(logs[name].get_logs())
+        equity = pd.DataFrame({spec.name: computed[runs[spec.name]] for spec in strategies})
+        return {
+            "equity": equity,
+            "metrics": {name: flag_suspicious(backtest_metrics(equity[name])) for name in equity.columns},
+            "weights": {spec.name: bt.weights(runs[spec.name]) for spec in strategies},
+        }
+
+    def run_backtest_comparison(
+        self,
+    ) -> Dict[str, Any]:
+        """
+        Run backtest WITH and WITHOUT risk engine (one pass). Returns both equity curves and metrics.
+        """
+        if self.returns is None:
+            self.load_and_prepare()
+        result = self.run_strategies([
+            StrategySpec("with_risk", True, self.risk_level, self.allocation_method),
+            StrategySpec("without_risk", False, self.risk_level, self.allocation_method),
+        ])
+        equity_with = result["equity"]["with_risk"].rename(None)
+        equity_no = result["equity"]["without_risk"].rename(None)
         # Correlation matrix from full backtest returns (for heatmap)
         corr = self.returns.corr()
         labels = list(corr.columns)
@@ -179,13 +435,84 @@ class CoreEngine:
         return {
             "equity_with_risk": equity_with,
             "equity_without_risk": equity_no,
-            "metrics_with_risk": metrics_with,
-            "metrics_without_risk": metrics_no,
+            "metrics_with_risk": result["metrics"]["with_risk"],
+            "metrics_without_risk": result["metrics"]["without_risk"],
             "dates": list(equity_with.index.astype(str)),
             "correlation_matrix": correlation_matrix,
             "correlation_labels": labels,
+            "weights_with_risk": result["weights"]["with_risk"],
         }
 
+    def rolling_var(self, weights: pd.DataFrame, method: str = cfg.VAR_METHOD) -> pd.DataFrame:
+        """Daily VaR / CVaR (columns var, cvar) of the portfolio held by weights (e.g. weights_with_risk)."""
+        if self.returns is None:
+            self.load_and_prepare()
+        return VaREngine().rolling(self.returns, weights, method)
+
+    def run_walk_forward_backtest(
+        self,
+        with_risk: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Out-of-sample walk-forward backtest (config TRAIN_WINDOW / TEST_WINDOW):
+        regime model refit per fold, folds run in a process pool.
+        """
+        if self.returns is None:
+            self.load_and_prepare()
+        return run_walk_forward(
+            self.returns,
+            self.features["volatility"],
+            self.features["drawdown"],
+            self.features["trend_signal"],
+            train_window=cfg.TRAIN_WINDOW,
+            test_window=cfg.TEST_WINDOW,
+            with_risk=with_risk,
+            vol_target=self.vol_target,
+            max_drawdown_limit=self.max_drawdown_limit,
+            exposure_floor=self.exposure_floor,
+            vol_window=self.vol_window,
+            max_workers=max_workers,
+        )
+
+    def run_monte_carlo(
+        self,
+        n_paths: int = cfg.MONTE_CARLO_PATHS,
+        method: str = "bootstrap",
+        n_days: Optional[int] = None,
+        block_size: int = cfg.MONTE_CARLO_BLOCK_SIZE,
+        with_risk: bool = True,
+        seed: int = 42,
+        confidence: float = 0.90,
+        keep_equity: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Regime strategy at this engine's risk level over n_paths resampled paths ("bootstrap" or
+        "regime"). Returns MonteCarloBacktest.run output (metric samples, summary, equity bands,
+        equity P x T when keep_equity).
+        """
+        if self.returns is None:
+            self.load_and_prepare()
+        mc = MonteCarloBacktest(
+            self.returns,
+            self.regime_codes,
+            vol_target=self.vol_target,
+            max_drawdown_limit=self.max_drawdown_limit,
+            exposure_floor=self.exposure_floor,
+            with_risk=with_risk,
+            vol_window=self.vol_window,
+            seed=seed,
+        )
+        return mc.run(
+            n_paths, method, n_days=n_days, block_size=block_size, confidence=confidence, keep_equity=keep_equity
+        )
+
+    def sweep_engine(self, max_workers: Optional[int] = None) -> SweepEngine:
+        """Parameter sweep (risk settings, rebalance frequency, costs) over this engine's returns and regimes."""
+        if self.returns is None:
+            self.load_and_prepare()
+        return SweepEngine(self.returns, self.regime_codes, vol_window=self.vol_window, max_workers=max_workers)
+
     def get_decision_log(self, limit: Optional[int] = None) -> List[Dict]:
         if self.explainability is None:
             return []
@@ -1,3 +1,27 @@
+from .cache import FeatureCache, feature_cache
+from .features import LazyFeatures
 from .loader import DataEngine
+from .rolling_cov import RollingCovariance
+from .splits import WalkForwardSplit, walk_forward_splits
+from .sources import CSVSource, PriceSource, SyntheticSource, YFinanceSource
+from .store import PriceStore
+from .streaming import StreamingFeatureEngine
+from .synthetic import SyntheticMarket, bootstrap_indices
 
-__all__ = ["DataEngine"]
+__all__ = [
+    "DataEngine",
+    "LazyFeatures",
+    "FeatureCache",
+    "feature_cache",
+    "RollingCovariance",
+    "PriceSource",
+    "YFinanceSource",
+    "CSVSource",
+    "SyntheticSource",
+    "PriceStore",
+    "WalkForwardSplit",
+    "walk_forward_splits",
+    "StreamingFeatureEngine",
+    "SyntheticMarket",
+    "bootstrap_indices",
+]
@@ -0,0 +1,113 @@
+"""
+Feature Cache: process-wide LRU of prepared market data (prices, returns, lazy features).
+Keyed by (tickers, date range, window parameters, source); bounded by bytes.
+Shared by CoreEngine, RealtimeSimulator and the stress-test path, so identical requests
+skip data preparation entirely. Cached frames are shared: treat them as read-only.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from .. import config as cfg
+
+
+def _sizeof(value: Any) -> int:
+    nbytes = getattr(value, "nbytes", None)
+    return int(nbytes) if nbytes is not None else 0
+
+
+class FeatureCache:
+    """
+    Thread-safe LRU cache bounded by total bytes.
+    - get_or_load(key, factory): cached value or factory() (stored)
+    - invalidate(tickers): drop entries touching any of the tickers (all if None)
+    - stats(): hits, misses, evictions, entries, bytes
+    Entry sizes are re-measured on access because lazy features grow after insertion.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            value = self._entries[key]
+            self._sizes[key] = _sizeof(value)
+            self._evict(keep=key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = _sizeof(value)
+            self._evict(keep=None)
+
+    def get_or_load(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Load outside the lock so one slow download does not block other keys.
+        value = factory()
+        with self._lock:
+            existing = self._entries.get(key)
+        if existing is not None:
+            return existing
+        self.put(key, value)
+        return value
+
+    def invalidate(self, tickers: Optional[Iterable[str]] = None) -> int:
+        """Drop entries whose key includes any of tickers (every entry if None). Returns count."""
+        with self._lock:
+            if tickers is None:
+                keys = list(self._entries)
+            else:
+                wanted = set(tickers)
+                keys = [k for k in self._entries if wanted & set(k[0])]
+            for k in keys:
+                del self._entries[k]
+                del self._sizes[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self, keep: Optional[Hashable]) -> None:
+        for k in list(self._entries):
+            if self.nbytes <= self.max_bytes:
+                break
+            if k == keep:
+                continue
+            del self._entries[k]
+            del self._sizes[k]
+            self.evictions += 1
+
+
+# Process-wide instance used by CoreEngine (and through it the simulator and stress tests).
+feature_cache = FeatureCache(cfg.FEATURE_CACHE_MAX_BYTES)
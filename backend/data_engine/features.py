@@ -0,0 +1,62 @@
+"""
+Lazy feature mapping: each feature is computed on first access and memoized.
+Features nobody asks for are never computed; materialization times are recorded.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+
+class LazyFeatures(Mapping):
+    """
+    Read-only mapping name -> feature, built on demand from zero-argument builders.
+    - materialized(): names computed so far
+    - timings: seconds spent building each materialized feature
+    - release(name): drop a computed feature (it is rebuilt on next access)
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[], Any]]):
+        self._builders = dict(builders)
+        self._values: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        if name not in self._builders:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._values:
+                start = time.perf_counter()
+                value = self._builders[name]()
+                self.timings[name] = time.perf_counter() - start
+                self._values[name] = value
+        return self._values[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._builders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    def materialized(self) -> List[str]:
+        return list(self._values)
+
+    def report(self) -> Dict[str, Optional[float]]:
+        """Build time per feature in seconds (None = never materialized)."""
+        return {name: self.timings.get(name) for name in self._builders}
+
+    def release(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
+
+    def __repr__(self) -> str:
+        return f"LazyFeatures(materialized={self.materialized()}, available={list(self._builders)})"
@@ -5,18 +5,29 @@ No look-ahead: all computations use only past data at each timestamp.
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 
-try:
-    import yfinance as yf
-except ImportError:
-    yf = None
+from .. import config as cfg
+from .features import LazyFeatures
+from .rolling_cov import RollingCovariance
+from .sources import CSVSource, PriceSource, SyntheticSource, get_source
+from .splits import WalkForwardSplit, walk_forward_splits
+from .store import PriceStore
+from .streaming import StreamingFeatureEngine
+
+
+def _default_source() -> PriceSource:
+    if cfg.DATA_SOURCE == CSVSource.name:
+        return CSVSource(cfg.CSV_DATA_DIR)
+    if cfg.DATA_SOURCE == SyntheticSource.name:
+        return SyntheticSource(model=cfg.SYNTHETIC_MODEL)
+    return get_source(cfg.DATA_SOURCE)
 
 
 class DataEngine:
     """
     Single source of market data and derived series.
-    - Pull historical prices
+    - Pull historical prices (local PriceStore first, missing ranges from the source)
     - Compute: rolling returns, rolling vol, moving averages, rolling correlations
     - No data leakage (rolling windows only use past data).
     """
@@ -31,6 +42,9 @@ class DataEngine:
         trend_short: int = 50,
         trend_long: int = 200,
         corr_window: int = 63,
+        source: Optional[PriceSource] = None,
+        store: Optional[PriceStore] = None,
+        use_store: bool = True,
     ):
         self.tickers = tickers if isinstance(tickers, list) else [tickers]
         self.start_date = start_date
@@ -40,36 +54,73 @@ class DataEngine:
         self.trend_short = trend_short
         self.trend_long = trend_long
         self.corr_window = corr_window
+        self.source = source or _default_source()
+        if store is None and use_store and cfg.PRICE_STORE_DIR:
+            store = PriceStore.for_source(cfg.PRICE_STORE_DIR, self.source)
+        self.store = store if use_store else None
 
         self._prices: Optional[pd.DataFrame] = None
         self._returns: Optional[pd.DataFrame] = None
-        self._features: Optional[dict] = None
+        self._features: Optional[LazyFeatures] = None
+        self._rolling_covs: Dict[Tuple[int, str], RollingCovariance] = {}
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, **kwargs) -> "DataEngine":
+        """Engine over an in-memory price panel (e.g. a SyntheticMarket panel); no source is queried."""
+        engine = cls(
+            list(prices.columns),
+            str(prices.index[0].date()),
+            str(prices.index[-1].date()),
+            use_store=False,
+            **kwargs,
+        )
+        engine._prices = prices
+        engine._returns = np.log(prices / prices.shift(1)).dropna()
+        return engine
+
+    @property
+    def cache_key(self) -> tuple:
+        """(tickers, date range, window parameters, source) — identifies prepared data for FeatureCache."""
+        return (
+            tuple(self.tickers),
+            str(self.start_date),
+            str(self.end_date),
+            self.vol_window,
+            self.momentum_window,
+            self.trend_short,
+            self.trend_long,
+            self.corr_window,
+            self.source.key,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by loaded prices/returns, materialized features and rolling covariance tensors."""
+        total = 0
+        for frame in (self._prices, self._returns):
+            if frame is not None:
+                total += int(frame.memory_usage(index=True).sum())
+        if self._features is not None:
+            for name in self._features.materialized():
+                value = self._features[name]
+                if isinstance(value, pd.DataFrame):
+                    if value is not self._returns:
+                        total += int(value.memory_usage(index=True).sum())
+                else:
+                    total += int(getattr(value, "nbytes", 0))
+        total += sum(engine.nbytes for engine in self._rolling_covs.values())
+        return total
 
     def load(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Download prices and compute log returns. Returns (prices, returns)."""
-        if yf is None:
-            raise ImportError("yfinance is required. pip install yfinance")
-        data = yf.download(
-            self.tickers,
-            start=self.start_date,
-            end=self.end_date,
-            progress=False,
-            auto_adjust=False,
-        )
-        if data.empty:
-            raise ValueError("No data downloaded. Check tickers or date range.")
-        if isinstance(data.columns, pd.MultiIndex):
-            if "Adj Close" in data.columns.levels[0]:
-                prices = data["Adj Close"].copy()
-            else:
-                prices = data["Close"].copy()
+        """Load prices (store, then source for missing ranges) and compute log returns. Returns (prices, returns)."""
+        start, end = pd.Timestamp(self.start_date), pd.Timestamp(self.end_date)
+        if self.store is not None:
+            prices = self.store.load(self.tickers, start, end, self.source)
         else:
-            if "Adj Close" in data.columns:
-                prices = data[["Adj Close"]].copy()
-            else:
-                prices = data[["Close"]].copy()
-            if len(self.tickers) == 1:
-                prices.columns = [self.tickers[0]]
+            prices = self.source.fetch(self.tickers, start, end)
+        if prices.empty or prices.isna().all().all():
+            raise ValueError("No data downloaded. Check tickers or date range.")
+        prices = prices.reindex(columns=self.tickers)
         prices = prices.dropna(how="all").ffill().dropna()
         returns = np.log(prices / prices.shift(1)).dropna()
         self._prices = prices
@@ -108,50 +159,70 @@ class DataEngine:
         cummax = p.cummax()
         return (p - cummax) / cummax.replace(0, np.nan)
 
-    def rolling_correlation(self) -> pd.DataFrame:
-        """Rolling correlation (returns). For heatmap use last slice or average."""
-        return self.get_returns().rolling(self.corr_window, min_periods=1).corr()
-
-    def get_features(self) -> dict:
-        """All features needed for regime and allocation. No leakage."""
+    def rolling_covariance(self, window: Optional[int] = None, dtype=np.float64) -> RollingCovariance:
+        """
+        Rolling covariance/correlation engine over returns (T x N x N tensors, aligned to returns index).
+        One engine per (window, dtype), shared by every caller of this DataEngine (tensors are built once).
+        """
+        key = (window or self.corr_window, np.dtype(dtype).str)
+        if key not in self._rolling_covs:
+            self._rolling_covs[key] = RollingCovariance(self.get_returns(), key[0], dtype=dtype)
+        return self._rolling_covs[key]
+
+    def rolling_correlation(self, dtype=np.float64) -> RollingCovariance:
+        """Rolling correlation (returns). For heatmap use .at(date) or .slice(start, end)."""
+        engine = self.rolling_covariance(dtype=dtype)
+        engine.correlation()
+        return engine
+
+    def get_features(self) -> LazyFeatures:
+        """
+        All features needed for regime and allocation. No leakage.
+        Lazy: each feature is computed (and timed) on first access only.
+        """
         if self._features is not None:
             return self._features
 
-        returns_df = self.get_returns()
-        
-        # Align all generated features to the returns index to ensure consistent length
-        common_index = returns_df.index
-        
-        volatility = self.rolling_volatility().loc[common_index]
-        momentum = self.rolling_momentum().loc[common_index]
-        trend_signal = self.moving_average_trend().loc[common_index]
-        drawdown = self.rolling_drawdown().loc[common_index]
-        correlation = self.rolling_correlation() # rolling_correlation is complex, handle alignment carefully
-
-        self._features = {
-            "returns": returns_df,
-            "volatility": volatility,
-            "momentum": momentum,
-            "trend_signal": trend_signal,
-            "drawdown": drawdown,
-            "correlation": correlation,
-        }
+        def aligned(build):
+            # Align generated features to the returns index to ensure consistent length
+            return lambda: build().loc[self.get_returns().index]
+
+        self._features = LazyFeatures({
+            "returns": self.get_returns,
+            "volatility": aligned(self.rolling_volatility),
+            "momentum": aligned(self.rolling_momentum),
+            "trend_signal": aligned(self.moving_average_trend),
+            "drawdown": aligned(self.rolling_drawdown),
+            "correlation": self.rolling_correlation,
+        })
         return self._features
 
+    def streaming_features(self) -> StreamingFeatureEngine:
+        """Online feature engine with the same windows, for one-bar-at-a-time feeds."""
+        return StreamingFeatureEngine(
+            self.tickers,
+            vol_window=self.vol_window,
+            momentum_window=self.momentum_window,
+            trend_short=self.trend_short,
+            trend_long=self.trend_long,
+        )
+
+    def iter_walk_forward(self, train_window: int = 756, test_window: int = 126) -> Iterator[WalkForwardSplit]:
+        """Lazy walk-forward folds as index ranges over returns/prices (slice arrays with them, no copies)."""
+        return walk_forward_splits(len(self.get_returns()), train_window, test_window)
+
     def rolling_windows(
         self, train_window: int = 756, test_window: int = 126
     ) -> List[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
         """Walk-forward splits: (train_returns, test_returns, train_prices, test_prices)."""
         returns = self.get_returns()
         prices = self.get_prices()
-        total = len(returns)
-        splits = []
-        start = 0
-        while start + train_window + test_window <= total:
-            train_ret = returns.iloc[start : start + train_window]
-            test_ret = returns.iloc[start + train_window : start + train_window + test_window]
-            train_pr = prices.iloc[start : start + train_window]
-            test_pr = prices.iloc[start + train_window : start + train_window + test_window]
-            splits.append((train_ret, test_ret, train_pr, test_pr))
-            start += test_window
-        return splits
+        return [
+            (
+                returns.iloc[split.train_start : split.train_end],
+                returns.iloc[split.test_start : split.test_end],
+                prices.iloc[split.train_start : split.train_end],
+                prices.iloc[split.test_start : split.test_end],
+            )
+            for split in self.iter_walk_forward(train_window, test_window)
+        ]
@@ -0,0 +1,141 @@
+"""
+Rolling Covariance Engine: contiguous T x N x N rolling covariance / correlation tensors.
+Built from chunked cumulative cross-product sums instead of pandas rolling().cov()/corr().
+Row t uses returns in the window ending at t (inclusive); same semantics as
+pandas rolling(window, min_periods=1) with ddof=1 (NaN until 2 observations).
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class RollingCovariance:
+    """
+    Rolling covariance / correlation of a returns panel.
+    - covariance() / correlation(): T x N x N arrays (float64 or float32), computed once, cached
+    - at(date): N x N DataFrame for one date (e.g. correlation heatmap)
+    - slice(start, end): zero-copy view over a date range
+    - window_covariance(pos): one N x N row without building the tensor (large universes)
+    Sums are accumulated in float64 per chunk (prefix sums restart every chunk, so rounding
+    does not grow with history length); peak scratch memory is bounded by max_chunk_bytes.
+    """
+
+    def __init__(
+        self,
+        returns: pd.DataFrame,
+        window: int,
+        dtype=np.float64,
+        max_chunk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.index = returns.index
+        self.columns = list(returns.columns)
+        self.window = window
+        self.dtype = np.dtype(dtype)
+        self.max_chunk_bytes = max_chunk_bytes
+        self._values = returns.to_numpy(dtype=np.float64)
+        self._cov: Optional[np.ndarray] = None
+        self._corr: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self._cov, self._corr) if a is not None)
+
+    def covariance(self) -> np.ndarray:
+        """T x N x N rolling sample covariance."""
+        if self._cov is None:
+            self._cov = self._compute(normalize=False)
+        return self._cov
+
+    def correlation(self) -> np.ndarray:
+        """T x N x N rolling correlation (NaN where a variance is zero or undefined)."""
+        if self._corr is None:
+            if self._cov is not None:
+                self._corr = self._cov.copy()
+                self._to_correlation(self._corr)
+            else:
+                self._corr = self._compute(normalize=True)
+        return self._corr
+
+    def position(self, date) -> int:
+        """Row of the last date <= date."""
+        pos = int(self.index.searchsorted(pd.Timestamp(date), side="right")) - 1
+        if pos < 0:
+            raise KeyError(f"{date} is before the first date")
+        return pos
+
+    def at(self, date_or_pos: Union[int, str, pd.Timestamp], kind: str = "correlation") -> pd.DataFrame:
+        """N x N matrix for one date (or row position) as a labelled DataFrame."""
+        pos = date_or_pos if isinstance(date_or_pos, (int, np.integer)) else self.position(date_or_pos)
+        data = self.correlation() if kind == "correlation" else self.covariance()
+        return pd.DataFrame(data[pos], index=self.columns, columns=self.columns)
+
+    def slice(self, start=None, end=None, kind: str = "correlation") -> np.ndarray:
+        """View of rows with start <= date <= end (no copy)."""
+        data = self.correlation() if kind == "correlation" else self.covariance()
+        lo = 0 if start is None else int(self.index.searchsorted(pd.Timestamp(start), side="left"))
+        hi = len(self.index) if end is None else int(self.index.searchsorted(pd.Timestamp(end), side="right"))
+        return data[lo:hi]
+
+    def window_covariance(self, pos: int) -> np.ndarray:
+        """N x N covariance for row pos: read from the tensor if built, else computed from its window only."""
+        if self._cov is not None:
+            return np.asarray(self._cov[pos], dtype=np.float64)
+        block = self._values[max(0, pos - self.window + 1) : pos + 1]
+        if len(block) < 2:
+            return np.full((block.shape[1], block.shape[1]), np.nan)
+        centered = block - block.mean(axis=0)
+        return centered.T @ centered / (len(block) - 1)
+
+    def _compute(self, normalize: bool) -> np.ndarray:
+        x = self._values
+        t_len, n = x.shape
+        w = self.window
+        out = np.empty((t_len, n, n), dtype=self.dtype)
+        # Zero-pad so every row has a full-length window in padded coordinates:
+        # zeros add nothing to the sums; the true count is min(t + 1, w).
+        padded = np.vstack([np.zeros((w - 1, n)), x])
+        counts = np.minimum(np.arange(1, t_len + 1), w).astype(np.float64)
+
+        row_bytes = max(1, n * n * 8)
+        chunk = max(1, self.max_chunk_bytes // row_bytes - w)
+        for a in range(0, t_len, chunk):
+            b = min(t_len, a + chunk)
+            c = b - a
+            block = padded[a : b + w - 1]
+            p2 = np.empty((len(block) + 1, n, n))
+            p2[0] = 0.0
+            np.multiply(block[:, :, None], block[:, None, :], out=p2[1:])
+            np.cumsum(p2[1:], axis=0, out=p2[1:])
+            p1 = np.zeros((len(block) + 1, n))
+            np.cumsum(block, axis=0, out=p1[1:])
+
+            # In-place: cov = (S2 - S1 S1' / k) / (k - 1), straight into out when float64.
+            direct = self.dtype == np.float64
+            cov = out[a:b] if direct else np.empty((c, n, n))
+            np.subtract(p2[w:], p2[:c], out=cov)
+            del p2
+            s1 = p1[w:] - p1[:c]
+            cnt = counts[a:b]
+            cov -= (s1 / cnt[:, None])[:, :, None] * s1[:, None, :]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cov /= (cnt - 1)[:, None, None]
+            cov[cnt < 2] = np.nan
+            if normalize:
+                self._to_correlation(cov)
+            if not direct:
+                out[a:b] = cov
+        return out
+
+    @staticmethod
+    def _to_correlation(cov: np.ndarray) -> None:
+        """In-place covariance -> correlation over a stack of matrices."""
+        var = np.diagonal(cov, axis1=1, axis2=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(np.where(var > 0, var, np.nan))
+            cov /= std[:, :, None]
+            cov /= std[:, None, :]
@@ -0,0 +1,180 @@
+"""
+Price sources: pluggable providers of daily adjusted close prices.
+Every source returns a DataFrame indexed by date with one column per ticker,
+covering the half-open range [start, end) (same convention as yfinance).
+"""
+
+import os
+import zlib
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .synthetic import DEFAULT_REGIMES, SyntheticMarket
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None
+
+
+class PriceSource:
+    """
+    Base class for price providers used by DataEngine / PriceStore.
+    Subclasses implement fetch(tickers, start, end) -> prices DataFrame.
+    """
+
+    name = "base"
+
+    @property
+    def key(self) -> str:
+        """Identifies the data this source returns (used in cache keys)."""
+        return self.name
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        raise NotImplementedError
+
+    @staticmethod
+    def _empty(tickers: List[str]) -> pd.DataFrame:
+        return pd.DataFrame(columns=list(tickers), index=pd.DatetimeIndex([]), dtype=float)
+
+
+class YFinanceSource(PriceSource):
+    """Yahoo Finance via yfinance (network). Prefers Adj Close, falls back to Close."""
+
+    name = "yfinance"
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        if yf is None:
+            raise ImportError("yfinance is required. pip install yfinance")
+        data = yf.download(
+            tickers,
+            start=start,
+            end=end,
+            progress=False,
+            auto_adjust=False,
+        )
+        if data.empty:
+            return self._empty(tickers)
+        if isinstance(data.columns, pd.MultiIndex):
+            if "Adj Close" in data.columns.levels[0]:
+                prices = data["Adj Close"].copy()
+            else:
+                prices = data["Close"].copy()
+        else:
+            if "Adj Close" in data.columns:
+                prices = data[["Adj Close"]].copy()
+            else:
+                prices = data[["Close"]].copy()
+            if len(tickers) == 1:
+                prices.columns = [tickers[0]]
+        prices.index = pd.DatetimeIndex(prices.index).tz_localize(None).normalize()
+        return prices.astype(float)
+
+
+class CSVSource(PriceSource):
+    """
+    Directory of per-ticker CSV files (<directory>/<TICKER>.csv) in Yahoo export format:
+    a Date column plus Adj Close (preferred) or Close.
+    """
+
+    name = "csv"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{os.path.abspath(self.directory)}"
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        columns = {}
+        for ticker in tickers:
+            path = os.path.join(self.directory, f"{ticker}.csv")
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path)
+            date_col = "Date" if "Date" in df.columns else df.columns[0]
+            price_col = "Adj Close" if "Adj Close" in df.columns else "Close"
+            series = pd.Series(
+                df[price_col].astype(float).values,
+                index=pd.DatetimeIndex(pd.to_datetime(df[date_col])).tz_localize(None).normalize(),
+            ).sort_index()
+            columns[ticker] = series[(series.index >= start) & (series.index < end)]
+        if not columns:
+            return self._empty(tickers)
+        return pd.DataFrame(columns)
+
+
+class SyntheticSource(PriceSource):
+    """
+    Deterministic offline prices on business days.
+    - model="gbm": per-ticker GBM; correlation > 0 adds a shared market factor
+    - model="regime": per-ticker paths driven by a shared BULL/BEAR/HIGH_VOL/CRASH regime chain
+    Each ticker's path depends only on (seed, ticker) plus the shared factor/regime streams,
+    and is generated from a fixed origin, so overlapping fetches always return the same prices.
+    """
+
+    name = "synthetic"
+
+    def __init__(
+        self,
+        seed: int = 42,
+        origin: str = "1970-01-01",
+        model: str = "gbm",
+        correlation: float = 0.0,
+    ):
+        if model not in ("gbm", "regime"):
+            raise ValueError(f"Unknown synthetic model: {model}")
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.model = model
+        self.correlation = correlation
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}:{self.seed}:{self.origin.date()}:{self.model}:{self.correlation}"
+
+    def fetch(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        if end <= self.origin:
+            return self._empty(tickers)
+        dates = pd.bdate_range(self.origin, end - pd.Timedelta(days=1))
+        mask = dates >= start
+        n = len(dates)
+        shared = np.random.default_rng([self.seed, 0])
+        if self.model == "regime":
+            path = SyntheticMarket(seed=self.seed).regime_path(n)
+            params = list(DEFAULT_REGIMES.values())
+            drift = np.array([p["mu"] for p in params])[path] / 252
+            vol = np.array([p["sigma"] for p in params])[path] / np.sqrt(252)
+            rho = np.array([p["rho"] for p in params])[path]
+        else:
+            rho = np.full(n, self.correlation)
+        common = shared.standard_normal(n) if np.any(rho > 0) else np.zeros(n)
+
+        columns = {}
+        for ticker in tickers:
+            rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+            mu = rng.uniform(0.02, 0.10) / 252
+            sigma = rng.uniform(0.08, 0.30) / np.sqrt(252)
+            z = np.sqrt(rho) * common + np.sqrt(1.0 - rho) * rng.standard_normal(n)
+            if self.model == "regime":
+                # Ticker-specific drift/vol tilt on top of the regime's parameters.
+                mu, sigma = drift + (mu - 0.06 / 252), vol * sigma / (0.19 / np.sqrt(252))
+            log_ret = (mu - 0.5 * sigma ** 2) + sigma * z
+            log_ret[0] = 0.0
+            prices = 100.0 * np.exp(np.cumsum(log_ret))
+            columns[ticker] = prices[mask]
+        return pd.DataFrame(columns, index=dates[mask])
+
+
+def get_source(name: str, **kwargs) -> PriceSource:
+    """Build a source by name: 'yfinance' | 'csv' | 'synthetic'."""
+    if name == YFinanceSource.name:
+        return YFinanceSource()
+    if name == CSVSource.name:
+        return CSVSource(kwargs["directory"])
+    if name == SyntheticSource.name:
+        return SyntheticSource(**kwargs)
+    raise ValueError(f"Unknown data source: {name}")
@@ -0,0 +1,37 @@
+"""
+Walk-forward splits as index ranges: nothing is sliced or copied until a fold is used,
+and slicing a NumPy array with a split gives views over the shared array.
+"""
+
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+
+class WalkForwardSplit(NamedTuple):
+    """Positions of one fold: train rows [train_start, train_end), test rows [test_start, test_end)."""
+
+    fold: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+    def train(self, values: np.ndarray) -> np.ndarray:
+        """Training rows of an array (a view for NumPy arrays)."""
+        return values[self.train_start : self.train_end]
+
+    def test(self, values: np.ndarray) -> np.ndarray:
+        """Test rows of an array (a view for NumPy arrays)."""
+        return values[self.test_start : self.test_end]
+
+
+def walk_forward_splits(total: int, train_window: int, test_window: int) -> Iterator[WalkForwardSplit]:
+    """Rolling train/test folds stepping by test_window, generated lazily."""
+    start = 0
+    fold = 0
+    while start + train_window + test_window <= total:
+        train_end = start + train_window
+        yield WalkForwardSplit(fold, start, train_end, train_end, train_end + test_window)
+        start += test_window
+        fold += 1
@@ -0,0 +1,175 @@
+"""
+Price Store: local columnar, memory-mapped cache of daily prices, one directory per ticker.
+Layout: <root>/<TICKER>/prices.npy (records: date datetime64[ns], close float64), meta.json
+(covered range). Dates and closes are one file, replaced atomically, so a reader never pairs
+columns from different writes; coverage only grows and is written after the data.
+A store holds one source's prices: PriceStore.for_source roots it in a per-source subdirectory.
+Only date ranges not yet covered are fetched from the source; reads never touch the network.
+Stores on the same root share one lock per process and an advisory file lock across processes.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, threads are still serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from .sources import PriceSource
+
+PRICE_DTYPE = np.dtype([("date", "datetime64[ns]"), ("close", np.float64)])
+
+# One lock per store root, shared by every PriceStore instance on that root.
+_root_locks: Dict[str, threading.Lock] = {}
+_root_locks_guard = threading.Lock()
+
+
+def _root_lock(root: str) -> threading.Lock:
+    with _root_locks_guard:
+        return _root_locks.setdefault(os.path.abspath(root), threading.Lock())
+
+
+class PriceStore:
+    """
+    On-disk price cache in front of a PriceSource.
+    - Coverage per ticker is one contiguous half-open range [start, end)
+    - Missing head/tail ranges are fetched (batched across tickers that miss the same range)
+    - Reads are memory-mapped and sliced by binary search on the date column
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = _root_lock(root)
+
+    @classmethod
+    def for_source(cls, root: str, source: PriceSource) -> "PriceStore":
+        """Store under root/<source name>-<hash of source.key>, so sources never share prices."""
+        digest = hashlib.sha1(source.key.encode()).hexdigest()[:12]
+        return cls(os.path.join(root, f"{source.name}-{digest}"))
+
+    def load(
+        self,
+        tickers: List[str],
+        start,
+        end,
+        source: PriceSource,
+    ) -> pd.DataFrame:
+        """Prices for [start, end), fetching only uncovered ranges. Columns follow tickers order."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        with self._locked():
+            self._fill_missing(tickers, start, end, source)
+            frame = pd.DataFrame({t: self._read(t, start, end) for t in tickers})
+        return frame.sort_index()
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Root lock for this process, plus an flock on <root>/.lock for other processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, ".lock"), "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def coverage(self, ticker: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        directory = self._ticker_dir(ticker)
+        meta_path = os.path.join(directory, "meta.json")
+        # Coverage without prices.npy (e.g. the earlier date.npy / close.npy layout) is a miss.
+        if not os.path.exists(meta_path) or not os.path.exists(os.path.join(directory, "prices.npy")):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+
+    def missing_ranges(
+        self, ticker: str, start: pd.Timestamp, end: pd.Timestamp
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Sub-ranges of [start, end) not yet covered for ticker."""
+        covered = self.coverage(ticker)
+        if covered is None:
+            return [(start, end)]
+        cov_start, cov_end = covered
+        ranges = []
+        if start < cov_start:
+            ranges.append((start, cov_start))
+        if end > cov_end:
+            # From cov_end (not start): coverage must stay one contiguous, actually fetched range.
+            ranges.append((cov_end, end))
+        return ranges
+
+    def _fill_missing(
+        self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp, source: PriceSource
+    ) -> None:
+        pending: Dict[Tuple[pd.Timestamp, pd.Timestamp], List[str]] = {}
+        for ticker in tickers:
+            for rng in self.missing_ranges(ticker, start, end):
+                pending.setdefault(rng, []).append(ticker)
+        for (fetch_start, fetch_end), group in pending.items():
+            fetched = source.fetch(group, fetch_start, fetch_end)
+            for ticker in group:
+                series = fetched[ticker].dropna() if ticker in fetched.columns else pd.Series(dtype=float)
+                self._merge(ticker, series, fetch_start, fetch_end)
+
+    def _merge(self, ticker: str, series: pd.Series, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        # Today's bar may still be forming: never mark it as covered.
+        end = min(end, pd.Timestamp.today().normalize())
+        covered = self.coverage(ticker)
+        dates, closes = self._columns(ticker)
+        if dates is not None and len(dates) > 0:
+            existing = pd.Series(np.asarray(closes), index=pd.DatetimeIndex(np.asarray(dates)))
+            series = pd.concat([existing, series])
+            series = series[~series.index.duplicated(keep="last")]
+        series = series.sort_index()
+        if covered is not None:
+            start, end = min(start, covered[0]), max(end, covered[1])
+        if end <= start:
+            return
+        directory = self._ticker_dir(ticker)
+        os.makedirs(directory, exist_ok=True)
+        records = np.empty(len(series), dtype=PRICE_DTYPE)
+        records["date"] = series.index.values.astype("datetime64[ns]")
+        records["close"] = series.values.astype(np.float64)
+        self._atomic_save(os.path.join(directory, "prices.npy"), records)
+        meta_path = os.path.join(directory, "meta.json")
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+        os.replace(tmp, meta_path)
+
+    def _read(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        dates, closes = self._columns(ticker)
+        if dates is None:
+            return pd.Series(dtype=float)
+        lo = np.searchsorted(dates, np.datetime64(start, "ns"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(end, "ns"), side="left")
+        return pd.Series(np.array(closes[lo:hi]), index=pd.DatetimeIndex(np.array(dates[lo:hi])))
+
+    def _columns(self, ticker: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """(dates, closes) views of one memory-mapped file, so both come from the same write."""
+        path = os.path.join(self._ticker_dir(ticker), "prices.npy")
+        if not os.path.exists(path):
+            return None, None
+        records = np.load(path, mmap_mode="r")
+        return records["date"], records["close"]
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.replace(os.sep, "_"))
+
+    @staticmethod
+    def _atomic_save(path: str, array: np.ndarray) -> None:
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        np.save(tmp, array)
+        os.replace(tmp, path)
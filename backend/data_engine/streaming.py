@@ -0,0 +1,114 @@
+"""
+Streaming Feature Engine: online rolling vol, momentum, MA trend and drawdown.
+One bar at a time with O(assets) work per bar (running sums over ring buffers, running peaks).
+Matches DataEngine's batch features (same windows, min_periods=1) to floating-point tolerance.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class _RollingWindow:
+    """Ring buffer of the last `window` rows with running sum and sum of squares."""
+
+    def __init__(self, window: int, n_assets: int):
+        self.window = window
+        self._buf = np.zeros((window, n_assets))
+        self._pos = 0
+        self.count = 0
+        self.sum = np.zeros(n_assets)
+        self.sumsq = np.zeros(n_assets)
+
+    def push(self, x: np.ndarray) -> None:
+        if self.count == self.window:
+            old = self._buf[self._pos]
+            self.sum -= old
+            self.sumsq -= old * old
+        else:
+            self.count += 1
+        self._buf[self._pos] = x
+        self.sum += x
+        self.sumsq += x * x
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            # Re-anchor once per wrap so add/subtract rounding cannot drift.
+            self.sum = self._buf.sum(axis=0)
+            self.sumsq = (self._buf * self._buf).sum(axis=0)
+
+    def mean(self) -> np.ndarray:
+        return self.sum / self.count
+
+    def std(self) -> np.ndarray:
+        if self.count < 2:
+            return np.full_like(self.sum, np.nan)
+        var = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+
+class StreamingFeatureEngine:
+    """
+    Incremental counterpart of DataEngine.get_features for live feeds / the realtime simulator.
+    append_bar(prices) ingests one price bar and returns the new feature row:
+    returns, volatility (annualized), momentum, trend_signal, drawdown — one value per ticker.
+    The first bar only seeds state (no return yet) and returns None, like the batch
+    features which start on the first returns date.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        vol_window: int = 21,
+        momentum_window: int = 63,
+        trend_short: int = 50,
+        trend_long: int = 200,
+    ):
+        self.tickers = list(tickers)
+        n = len(self.tickers)
+        self._vol = _RollingWindow(vol_window, n)
+        self._momentum = _RollingWindow(momentum_window, n)
+        self._ma_short = _RollingWindow(trend_short, n)
+        self._ma_long = _RollingWindow(trend_long, n)
+        self._last_price: Optional[np.ndarray] = None
+        self._peak: Optional[np.ndarray] = None
+        self.n_bars = 0
+
+    def append_bar(self, prices: Union[Dict[str, float], pd.Series, np.ndarray]) -> Optional[Dict[str, np.ndarray]]:
+        """Ingest one price bar (dict / Series keyed by ticker, or array in ticker order)."""
+        p = self._as_array(prices)
+        self._ma_short.push(p)
+        self._ma_long.push(p)
+        self._peak = p.copy() if self._peak is None else np.maximum(self._peak, p)
+        last = self._last_price
+        self._last_price = p
+        self.n_bars += 1
+        if last is None:
+            return None
+
+        ret = np.log(p / last)
+        self._vol.push(ret)
+        self._momentum.push(ret)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(self._peak != 0, (p - self._peak) / self._peak, np.nan)
+        return {
+            "returns": ret,
+            "volatility": self._vol.std() * np.sqrt(252),
+            "momentum": self._momentum.mean(),
+            "trend_signal": (self._ma_short.mean() > self._ma_long.mean()).astype(int),
+            "drawdown": drawdown,
+        }
+
+    def warm_up(self, prices: pd.DataFrame) -> Optional[Dict[str, np.ndarray]]:
+        """Replay a price history (rows = bars) and return the last feature row."""
+        row = None
+        for values in prices.reindex(columns=self.tickers).to_numpy(dtype=float):
+            row = self.append_bar(values)
+        return row
+
+    def _as_array(self, prices) -> np.ndarray:
+        if isinstance(prices, np.ndarray):
+            return prices.astype(float)
+        if isinstance(prices, dict):
+            return np.array([prices[t] for t in self.tickers], dtype=float)
+        return prices.reindex(self.tickers).to_numpy(dtype=float)
@@ -0,0 +1,171 @@
+"""
+Synthetic Market Generator: seeded, fully vectorized price panels for benchmarking and offline use.
+- Correlated GBM (one-factor constant correlation or full correlation matrix)
+- Regime-switching (BULL / BEAR / HIGH_VOL / CRASH Markov chain)
+- Block bootstrap (fixed or stationary blocks) resampled from a historical returns panel
+Panels of thousands of tickers x decades of daily or intraday bars build in seconds.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Annualized drift, annualized vol, pairwise correlation, mean duration in bars
+DEFAULT_REGIMES: Dict[str, Dict[str, float]] = {
+    "BULL": {"mu": 0.12, "sigma": 0.14, "rho": 0.30, "duration": 500},
+    "BEAR": {"mu": -0.10, "sigma": 0.22, "rho": 0.50, "duration": 150},
+    "HIGH_VOL": {"mu": 0.00, "sigma": 0.35, "rho": 0.60, "duration": 60},
+    "CRASH": {"mu": -0.80, "sigma": 0.60, "rho": 0.85, "duration": 15},
+}
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def bootstrap_indices(
+    rng: np.random.Generator,
+    history_len: int,
+    n_bars: int,
+    block_size: int = 21,
+    n_paths: int = 1,
+    stationary: bool = False,
+) -> np.ndarray:
+    """
+    n_paths x n_bars row indices into a history of length history_len.
+    Fixed blocks of block_size, or stationary bootstrap (geometric block lengths, mean block_size).
+    """
+    t = np.arange(n_bars)
+    if stationary:
+        new_block = rng.random((n_paths, n_bars)) < 1.0 / block_size
+        new_block[:, 0] = True
+        starts = rng.integers(0, history_len, size=(n_paths, n_bars))
+    else:
+        new_block = np.broadcast_to(t % block_size == 0, (n_paths, n_bars))
+        starts = rng.integers(0, max(1, history_len - block_size + 1), size=(n_paths, n_bars))
+    block_pos = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    block_start = np.take_along_axis(starts, block_pos, axis=1)
+    return (block_start + (t - block_pos)) % history_len
+
+
+class SyntheticMarket:
+    """
+    Seeded generator of price panels. Every method returns prices (first bar = start_price)
+    indexed by a date_range(start, periods=n_bars, freq=freq); bars_per_year sets the time step.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        start: str = "2000-01-03",
+        freq: str = "B",
+        bars_per_year: int = 252,
+        start_price: float = 100.0,
+    ):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.start = start
+        self.freq = freq
+        self.bars_per_year = bars_per_year
+        self.start_price = start_price
+
+    def correlated_gbm(
+        self,
+        n_assets: int,
+        n_bars: int,
+        mu: ArrayLike = 0.07,
+        sigma: ArrayLike = 0.20,
+        correlation: Union[float, np.ndarray] = 0.3,
+        tickers: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """GBM panel. correlation: scalar (one-factor, O(T*N)) or N x N matrix (Cholesky)."""
+        z = self._correlated_normals(n_bars, n_assets, correlation)
+        dt = 1.0 / self.bars_per_year
+        mu = np.broadcast_to(np.asarray(mu, dtype=float), (n_assets,))
+        sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (n_assets,))
+        log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z
+        return self._to_prices(log_ret, tickers)
+
+    def regime_path(
+        self,
+        n_bars: int,
+        regimes: Optional[Dict[str, Dict[str, float]]] = None,
+        transition: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Regime code per bar (index into regimes). Segment lengths are geometric with each
+        regime's mean duration; the next regime is drawn from the transition row (self excluded).
+        """
+        regimes = regimes or DEFAULT_REGIMES
+        k = len(regimes)
+        durations = np.array([r["duration"] for r in regimes.values()], dtype=float)
+        if transition is None:
+            transition = np.ones((k, k))
+        transition = np.array(transition, dtype=float)
+        np.fill_diagonal(transition, 0.0)
+        transition /= transition.sum(axis=1, keepdims=True)
+
+        path = np.empty(n_bars, dtype=np.int8)
+        pos, state = 0, 0
+        while pos < n_bars:
+            length = int(self.rng.geometric(1.0 / durations[state]))
+            path[pos : pos + length] = state
+            pos += length
+            state = int(self.rng.choice(k, p=transition[state]))
+        return path
+
+    def regime_switching(
+        self,
+        n_assets: int,
+        n_bars: int,
+        regimes: Optional[Dict[str, Dict[str, float]]] = None,
+        transition: Optional[np.ndarray] = None,
+        tickers: Optional[List[str]] = None,
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """Regime-switching panel. Returns (prices, regime label per bar)."""
+        regimes = regimes or DEFAULT_REGIMES
+        path = self.regime_path(n_bars, regimes, transition)
+        params = list(regimes.values())
+        mu = np.array([p["mu"] for p in params])[path][:, None]
+        sigma = np.array([p["sigma"] for p in params])[path][:, None]
+        rho = np.array([p["rho"] for p in params])[path][:, None]
+        # Per-asset vol scaling so assets are not identical in distribution.
+        sigma = sigma * self.rng.uniform(0.7, 1.3, size=n_assets)
+
+        common = self.rng.standard_normal((n_bars, 1))
+        idio = self.rng.standard_normal((n_bars, n_assets))
+        z = np.sqrt(rho) * common + np.sqrt(1.0 - rho) * idio
+        dt = 1.0 / self.bars_per_year
+        log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z
+        prices = self._to_prices(log_ret, tickers)
+        labels = pd.Series(pd.Categorical.from_codes(path, list(regimes)), index=prices.index)
+        return prices, labels
+
+    def block_bootstrap(
+        self,
+        history_returns: pd.DataFrame,
+        n_bars: int,
+        block_size: int = 21,
+        stationary: bool = False,
+    ) -> pd.DataFrame:
+        """Resample whole cross-sections of historical log returns in blocks (keeps correlations)."""
+        hist = history_returns.to_numpy(dtype=float)
+        idx = bootstrap_indices(self.rng, len(hist), n_bars, block_size, 1, stationary)[0]
+        return self._to_prices(hist[idx], list(history_returns.columns))
+
+    def _correlated_normals(self, n_bars: int, n_assets: int, correlation) -> np.ndarray:
+        idio = self.rng.standard_normal((n_bars, n_assets))
+        if np.ndim(correlation) == 0:
+            rho = float(correlation)
+            common = self.rng.standard_normal((n_bars, 1))
+            return np.sqrt(rho) * common + np.sqrt(1.0 - rho) * idio
+        chol = np.linalg.cholesky(np.asarray(correlation, dtype=float))
+        return idio @ chol.T
+
+    def _to_prices(self, log_ret: np.ndarray, tickers: Optional[List[str]]) -> pd.DataFrame:
+        n_bars, n_assets = log_ret.shape
+        log_ret[0] = 0.0
+        prices = self.start_price * np.exp(np.cumsum(log_ret, axis=0))
+        index = pd.date_range(self.start, periods=n_bars, freq=self.freq)
+        columns = tickers or [f"SYN{i:04d}" for i in range(n_assets)]
+        return pd.DataFrame(prices, index=index, columns=columns)
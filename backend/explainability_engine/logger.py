@@ -3,10 +3,12 @@ Explainability Engine: structured decision log for every rebalance/risk action.
 Each entry includes plain-language explanations so a 12th grader can understand.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import copy
 
+from ..regime_engine.detector import regime_label
+
 
 def _format_pct(w: float) -> str:
     return f"{w * 100:.0f}%" if w is not None else "—"
@@ -68,6 +70,7 @@ def _plain_language(
 class ExplainabilityEngine:
     """
     Logs every decision with: date, regime, portfolio_volatility, action_taken, reason, new_allocation,
+    risk_flags (risk overlays that fired, e.g. ["vol_target", "drawdown"]),
     plus plain-language fields (plain_summary, what_we_did, why_it_matters) for easy reading.
     """
 
@@ -77,7 +80,7 @@ class ExplainabilityEngine:
     def log(
         self,
         date: str,
-        regime: str,
+        regime: Union[str, int],
         portfolio_volatility: Optional[float] = None,
         action_taken: str = "",
         reason: str = "",
@@ -85,7 +88,9 @@ class ExplainabilityEngine:
         base_allocation: Optional[Dict[str, float]] = None,
         drawdown: Optional[float] = None,
         risk_reduced: bool = False,
+        risk_flags: Optional[List[str]] = None,
     ) -> None:
+        regime = regime_label(regime)
         plain = _plain_language(
             regime=regime,
             base_allocation=base_allocation,
@@ -107,6 +112,7 @@ class ExplainabilityEngine:
             "base_allocation": copy.deepcopy(base_allocation) if base_allocation else None,
             "drawdown": drawdown,
             "risk_reduced": risk_reduced,
+            "risk_flags": list(risk_flags or []),
             "plain_summary": plain["plain_summary"],
             "what_we_did": plain["what_we_did"],
             "why_it_matters": plain["why_it_matters"],
@@ -114,6 +120,10 @@ class ExplainabilityEngine:
         }
         self._logs.append(entry)
 
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """Append entries logged elsewhere (e.g. per-strategy logs of a multi-strategy backtest)."""
+        self._logs.extend(entries)
+
     def get_logs(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Return logs (newest last). Optionally limit count (take last N)."""
         if limit is not None:
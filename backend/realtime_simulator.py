@@ -1,6 +1,7 @@
 """
 Real-time simulation: 1 second = 1 trading day.
 Replays historical returns, runs regime + allocation + risk each "day", updates state and decision log.
+Features and regimes are updated causally, one bar per tick (streaming features + online regime detector).
 """
 
 import time
@@ -10,7 +11,10 @@ from datetime import datetime
 
 import pandas as pd
 
+from .backtest_engine import BacktestContext
 from .core_engine import CoreEngine
+from .data_engine import StreamingFeatureEngine
+from .regime_engine import REGIME_LABELS, OnlineRegimeDetector
 from .portfolio_state import PortfolioState
 from . import config as cfg
 
@@ -41,8 +45,10 @@ class RealtimeSimulator:
         self._state: Optional[PortfolioState] = None
         self._returns: Optional[pd.DataFrame] = None
         self._prices: Optional[pd.DataFrame] = None
-        self._regime_series: Optional[pd.Series] = None
+        self._feature_stream: Optional[StreamingFeatureEngine] = None
+        self._regime_detector: Optional[OnlineRegimeDetector] = None
         self._alloc_fn = None
+        self._context: Optional[BacktestContext] = None  # equity so far, O(1) per tick
         self._current_day_index = 0
         self._running = False
         self._thread: Optional[threading.Thread] = None
@@ -60,7 +66,8 @@ class RealtimeSimulator:
             self._engine.load_and_prepare()
             self._returns = self._engine.returns
             self._prices = self._engine.prices
-            self._regime_series = self._engine.regime_series
+            self._feature_stream = self._engine.data_engine.streaming_features()
+            self._regime_detector = self._engine.new_online_detector()
             self._alloc_fn = self._engine.build_allocation_function(with_risk=True)
             self._state = PortfolioState(
                 initial_capital=self.initial_capital,
@@ -68,6 +75,7 @@ class RealtimeSimulator:
                 cash=self.initial_capital,
                 risk_level=self.risk_level,
             )
+            self._context = BacktestContext(len(self._returns), index=self._returns.index)
             self._current_day_index = 0
             self._running = True
             self._thread = threading.Thread(target=self._run_loop, daemon=True)
@@ -82,18 +90,23 @@ class RealtimeSimulator:
         returns = self._returns
         n = len(returns)
         dates = returns.index
-        # Day 0: set initial value
+        # Seed features with the bar before the first return, then day 0.
+        for bar in self._prices.loc[: dates[0]].to_numpy(dtype=float):
+            features = self._feature_stream.append_bar(bar)
+        self._regime_detector.update(features)
         self._state.append_history(self._state.current_value, str(dates[0])[:10])
+        self._context.append(self._state.current_value)
         self._current_day_index = 1
         while self._running and self._current_day_index < n:
             i = self._current_day_index
             date_str = str(dates[i])[:10]
-            equity_so_far = pd.Series(self._state.equity_history) if self._state.equity_history else None
+            features = self._feature_stream.append_bar(self._prices.loc[dates[i]])
+            regime = self._regime_detector.update(features)
             if i % cfg.REBALANCE_FREQUENCY == 0:
-                weights = self._alloc_fn(i, equity_so_far)
+                weights = self._alloc_fn(i, self._context, regime=regime)
                 prices_i = self._prices.loc[dates[i]].to_dict()
                 self._state.update_from_weights(weights, prices_i)
-            self._state.current_regime = self._regime_series.iloc[i]
+            self._state.current_regime = REGIME_LABELS[regime]
             row = returns.iloc[i]
             port_ret = sum(
                 self._state.positions.get(t, 0) * self._prices.loc[dates[i], t] / self._state.current_value * row.get(t, 0)
@@ -101,6 +114,7 @@ class RealtimeSimulator:
             ) if self._state.current_value > 0 else 0
             self._state.current_value = self._state.current_value * (1 + port_ret)
             self._state.append_history(self._state.current_value, date_str)
+            self._context.append(self._state.current_value)
             self._current_day_index += 1
             if self.on_tick:
                 self.on_tick(self.get_state())
@@ -1,3 +1,22 @@
-from .detector import RegimeEngine
+from .detector import (
+    REGIME_CODES,
+    REGIME_LABELS,
+    RegimeEngine,
+    codes_to_series,
+    regime_code,
+    regime_label,
+)
+from .model_store import RegimeModelStore, regime_model_store
+from .online import OnlineRegimeDetector
 
-__all__ = ["RegimeEngine"]
+__all__ = [
+    "RegimeEngine",
+    "REGIME_LABELS",
+    "REGIME_CODES",
+    "regime_label",
+    "regime_code",
+    "codes_to_series",
+    "RegimeModelStore",
+    "regime_model_store",
+    "OnlineRegimeDetector",
+]
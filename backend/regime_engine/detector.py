@@ -1,38 +1,129 @@
 """
-Regime Detection Engine: Clustering using KMeans on vol, drawdown, trend features.
-Output: TRENDING_UP | TRENDING_DOWN | HIGH_VOL | CRASH
+Regime Detection Engine: rules on vol, drawdown, trend features, plus optional KMeans clustering.
+Output: TRENDING_UP | TRENDING_DOWN | HIGH_VOL | CRASH, as compact int8 codes
+(REGIME_LABELS[code]) or a categorical Series for display. Codes come from the rules alone;
+cluster ids (labels_) are only computed for callers that fit() the clustering.
 """
 
+import copy
+import warnings
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Union
+
 import pandas as pd
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
+if TYPE_CHECKING:
+    from .model_store import RegimeModelStore
+
 
 REGIME_TRENDING_UP = "TRENDING_UP"
 REGIME_TRENDING_DOWN = "TRENDING_DOWN"
 REGIME_HIGH_VOL = "HIGH_VOL"
 REGIME_CRASH = "CRASH"
 
+# Regime codes: int8 index into REGIME_LABELS
+REGIME_LABELS = (REGIME_TRENDING_UP, REGIME_TRENDING_DOWN, REGIME_HIGH_VOL, REGIME_CRASH)
+REGIME_CODES = {label: code for code, label in enumerate(REGIME_LABELS)}
+CODE_TRENDING_UP, CODE_TRENDING_DOWN, CODE_HIGH_VOL, CODE_CRASH = range(4)
+
+
+def regime_label(regime: Union[str, int, np.integer]) -> str:
+    """Label for a regime given as label or code."""
+    if isinstance(regime, (int, np.integer)):
+        return REGIME_LABELS[regime]
+    return regime
+
+
+def regime_code(regime: Union[str, int, np.integer]) -> int:
+    """Code for a regime given as label or code."""
+    if isinstance(regime, (int, np.integer)):
+        return int(regime)
+    return REGIME_CODES[regime]
+
+
+def codes_to_series(codes: np.ndarray, index=None) -> pd.Series:
+    """Categorical Series of regime labels from an int8 code array (display / API)."""
+    return pd.Series(pd.Categorical.from_codes(codes, REGIME_LABELS), index=index)
+
 
 class RegimeEngine:
     """
-    Detects market regime using KMeans clustering.
+    Detects market regime with per-row rules. fit() additionally clusters the features (KMeans);
+    predict_codes then also leaves cluster ids in labels_. With a model_store, fitted models are
+    reused for identical features and warm-started (incremental centroid update on the new rows
+    only) when the history is extended.
     """
 
+    N_CLUSTERS = 4
+
     def __init__(
         self,
         vol_threshold: float = 0.25,
         drawdown_threshold: float = -0.15,
+        model_store: Optional["RegimeModelStore"] = None,
     ):
         self.vol_threshold = vol_threshold
         self.drawdown_threshold = drawdown_threshold
+        self.model_store = model_store
         self._scaler = StandardScaler()
-        self._kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
+        self._kmeans = KMeans(n_clusters=self.N_CLUSTERS, random_state=42, n_init=10)
+        self._counts: Optional[np.ndarray] = None
+        self.fit_mode: Optional[str] = None  # "fit" | "loaded" | "warm_start"
+
+    @property
+    def model_params(self) -> dict:
+        return {"n_clusters": self.N_CLUSTERS, "random_state": 42, "n_init": 10}
 
     def _fit_clustering(self, feature_matrix: np.ndarray) -> None:
+        if self.model_store is None:
+            self._full_fit(feature_matrix)
+            return
+        params = self.model_params
+        entry, exact = self.model_store.lookup(params, feature_matrix)
+        if entry is not None and exact:
+            self._scaler, self._kmeans, self._counts = entry["scaler"], entry["kmeans"], entry["counts"]
+            self.fit_mode = "loaded"
+            return
+        if entry is not None:
+            self._warm_start(entry, feature_matrix[entry["n_rows"]:])
+        else:
+            self._full_fit(feature_matrix)
+        self.model_store.save(
+            params,
+            feature_matrix,
+            {"scaler": self._scaler, "kmeans": self._kmeans, "counts": self._counts},
+        )
+
+    def _full_fit(self, feature_matrix: np.ndarray) -> None:
         X = self._scaler.fit_transform(feature_matrix)
         self._kmeans.fit(X)
+        self._counts = np.bincount(self._kmeans.labels_, minlength=self.N_CLUSTERS).astype(float)
+        self.fit_mode = "fit"
+
+    def _warm_start(self, entry: dict, new_rows: np.ndarray) -> None:
+        """
+        Extend a stored model with new rows in O(new rows): running-mean update of the scaler
+        (partial_fit) and of each centroid (in raw feature space) from its assigned new rows.
+        """
+        old_scaler = entry["scaler"]
+        scaler = copy.deepcopy(old_scaler)
+        kmeans = copy.deepcopy(entry["kmeans"])
+        counts = np.array(entry["counts"], dtype=float)
+        centers = old_scaler.inverse_transform(kmeans.cluster_centers_)
+
+        labels = kmeans.predict(old_scaler.transform(new_rows))
+        for k in range(self.N_CLUSTERS):
+            members = new_rows[labels == k]
+            if len(members):
+                centers[k] = (counts[k] * centers[k] + members.sum(axis=0)) / (counts[k] + len(members))
+                counts[k] += len(members)
+
+        scaler.partial_fit(new_rows)
+        kmeans.cluster_centers_ = scaler.transform(centers)
+        self._scaler, self._kmeans, self._counts = scaler, kmeans, counts
+        self.fit_mode = "warm_start"
 
     def _map_cluster_to_regime(self, label: int, feature_row: np.ndarray) -> str:
         """Map cluster to regime by convention: high vol -> HIGH_VOL, low trend -> DOWN, etc."""
@@ -43,30 +134,104 @@ class RegimeEngine:
             return REGIME_HIGH_VOL
         return REGIME_TRENDING_UP if trend > 0.5 else REGIME_TRENDING_DOWN
 
-    def generate_regime_series(
+    @staticmethod
+    def feature_matrix(volatility, drawdown, trend_signal) -> np.ndarray:
+        """Cross-sectional mean of (vol, drawdown, trend) per row. Accepts DataFrames or 2-D arrays."""
+        columns = []
+        for feature in (volatility, drawdown, trend_signal):
+            values = np.asarray(feature, dtype=float)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)  # all-NaN rows -> 0 below
+                columns.append(np.nanmean(values, axis=1).reshape(-1, 1))
+        return np.nan_to_num(np.hstack(columns), nan=0.0)
+
+    def fit(self, volatility, drawdown, trend_signal) -> "RegimeEngine":
+        """Fit scaler + clustering on a (training) window of features."""
+        self._fit_clustering(self.feature_matrix(volatility, drawdown, trend_signal))
+        return self
+
+    def label_codes(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Vectorized regime rules over (vol, drawdown, trend) rows -> int8 codes (same rules as _map_cluster_to_regime)."""
+        vol, dd, trend = feature_matrix[..., 0], feature_matrix[..., 1], feature_matrix[..., 2]
+        return np.select(
+            [dd < self.drawdown_threshold, vol > self.vol_threshold, trend > 0.5],
+            [CODE_CRASH, CODE_HIGH_VOL, CODE_TRENDING_UP],
+            default=CODE_TRENDING_DOWN,
+        ).astype(np.int8)
+
+    def predict_codes(self, volatility, drawdown, trend_signal) -> np.ndarray:
+        """int8 regime code per row; after fit(), cluster ids of the rows land in labels_."""
+        feature_matrix = self.feature_matrix(volatility, drawdown, trend_signal)
+        if self.fit_mode is not None:
+            self.labels_ = self._kmeans.predict(self._scaler.transform(feature_matrix))
+        return self.label_codes(feature_matrix)
+
+    def predict(self, volatility, drawdown, trend_signal, index=None) -> pd.Series:
+        """Categorical regime labels with the fitted model. index defaults to volatility's index."""
+        codes = self.predict_codes(volatility, drawdown, trend_signal)
+        if index is None:
+            index = volatility.index if hasattr(volatility, "index") else None
+        return codes_to_series(codes, index)
+
+    def generate_regime_codes(
         self,
         volatility: pd.DataFrame,
         drawdown: pd.DataFrame,
         trend_signal: pd.DataFrame,
-    ) -> pd.Series:
-        """
-        Returns a Series of regime labels (TRENDING_UP, TRENDING_DOWN, HIGH_VOL, CRASH)
-        aligned to the same index as volatility.
-        """
+    ) -> np.ndarray:
+        """int8 regime code per row (REGIME_LABELS[code]); no clustering is fitted (see fit())."""
         self.volatility = volatility
         self.drawdown = drawdown
         self.trend_signal = trend_signal
-        n = len(volatility)
+        return self.label_codes(self.feature_matrix(volatility, drawdown, trend_signal))
 
-        vol_flat = volatility.mean(axis=1).values.reshape(-1, 1)
-        dd_flat = drawdown.mean(axis=1).values.reshape(-1, 1)
-        trend_flat = trend_signal.mean(axis=1).values.reshape(-1, 1)
-        feature_matrix = np.hstack([vol_flat, dd_flat, trend_flat])
-        feature_matrix = np.nan_to_num(feature_matrix, nan=0.0)
+    @staticmethod
+    def feature_tensor(volatility, drawdown, trend_signal, groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        T x N x 3 per-asset (vol, drawdown, trend) tensor. With groups (integer group id per asset),
+        features are averaged within each group first -> T x G x 3. NaN -> 0 as in feature_matrix.
+        """
+        tensor = np.stack([np.asarray(f, dtype=float) for f in (volatility, drawdown, trend_signal)], axis=-1)
+        if groups is not None:
+            one_hot = (np.asarray(groups)[:, None] == np.arange(int(np.max(groups)) + 1)[None, :]).astype(float)
+            valid = ~np.isnan(tensor)
+            sums = np.einsum("tnf,ng->tgf", np.where(valid, tensor, 0.0), one_hot)
+            counts = np.einsum("tnf,ng->tgf", valid.astype(float), one_hot)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                tensor = sums / counts
+        return np.nan_to_num(tensor, nan=0.0)
 
-        self._fit_clustering(feature_matrix)
-        X = self._scaler.transform(feature_matrix)
-        labels = self._kmeans.predict(X)
+    def generate_asset_regime_codes(
+        self,
+        volatility: pd.DataFrame,
+        drawdown: pd.DataFrame,
+        trend_signal: pd.DataFrame,
+        groups: Optional[Union[Dict[str, str], Sequence[str]]] = None,
+    ) -> np.ndarray:
+        """
+        Per-asset regimes: T x N int8 code matrix in one vectorized pass (the regime rules on
+        each asset's own features; no clustering is fitted, so cost is linear in T * N).
+        groups (ticker -> group, or one label per column) labels each sector group once and
+        broadcasts to its members.
+        """
+        inverse = None
+        if groups is not None:
+            if isinstance(groups, dict):
+                groups = [groups.get(t, t) for t in volatility.columns]
+            _, inverse = np.unique(np.asarray(groups, dtype=str), return_inverse=True)
+        tensor = self.feature_tensor(volatility, drawdown, trend_signal, inverse)
+        codes = self.label_codes(tensor)
+        return codes if inverse is None else codes[:, inverse]
 
-        regimes = [self._map_cluster_to_regime(labels[i], feature_matrix[i]) for i in range(n)]
-        return pd.Series(regimes, index=volatility.index)
+    def generate_regime_series(
+        self,
+        volatility: pd.DataFrame,
+        drawdown: pd.DataFrame,
+        trend_signal: pd.DataFrame,
+    ) -> pd.Series:
+        """
+        Returns a categorical Series of regime labels (TRENDING_UP, TRENDING_DOWN, HIGH_VOL, CRASH)
+        aligned to the same index as volatility.
+        """
+        codes = self.generate_regime_codes(volatility, drawdown, trend_signal)
+        return codes_to_series(codes, volatility.index)
@@ -0,0 +1,193 @@
+"""
+Regime Model Store: fitted scaler + KMeans persisted on disk, keyed by a fingerprint of the
+feature matrix and the clustering parameters.
+- Same features again -> load the fitted model (no clustering on the request path)
+- Same history extended with new rows -> warm-start from the stored model on the prefix
+Models are grouped by (parameters, first feature row); each file records how many rows
+it was fitted on and the fingerprint of those rows, so extensions are detected exactly.
+Memory (memoized models) and disk (models per group, number of groups) are both bounded.
+Only RegimeEngine.fit uses the store: regime codes never need a fitted model, so callers that
+want cluster ids (labels_) opt in by calling fit().
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .. import config as cfg
+
+
+def fingerprint(feature_matrix: np.ndarray) -> str:
+    return hashlib.sha1(np.ascontiguousarray(feature_matrix, dtype=np.float64).tobytes()).hexdigest()
+
+
+class RegimeModelStore:
+    """
+    Directory of pickled regime models: <root>/<group>/<fingerprint>.pkl, plus a per-group
+    index.json (fingerprint -> n_rows) so prefix lookups unpickle only the matching model.
+    Entries are dicts: scaler, kmeans, counts (rows per cluster), n_rows, fingerprint, params.
+    Loaded entries are memoized in-process (LRU, at most max_memo); at most max_per_group models
+    are kept per group and at most max_groups groups on disk (least recently used evicted).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_per_group: int = 8,
+        max_groups: int = cfg.REGIME_MODEL_MAX_GROUPS,
+        max_memo: int = 32,
+    ):
+        self.root = root
+        self.max_per_group = max_per_group
+        self.max_groups = max_groups
+        self.max_memo = max_memo
+        self._memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def group_key(params: Dict[str, Any], feature_matrix: np.ndarray) -> str:
+        head = repr(sorted(params.items())).encode() + feature_matrix[:1].tobytes()
+        return hashlib.sha1(head).hexdigest()
+
+    def lookup(
+        self, params: Dict[str, Any], feature_matrix: np.ndarray
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        (entry, exact). exact=True: fitted on exactly these rows. exact=False with an entry:
+        fitted on the longest stored prefix of these rows. (None, False) if nothing usable.
+        """
+        if len(feature_matrix) == 0:
+            return None, False
+        group = self.group_key(params, feature_matrix)
+        directory = os.path.join(self.root, group)
+        full = fingerprint(feature_matrix)
+        entry = self._load(os.path.join(directory, f"{full}.pkl"))
+        if entry is not None:
+            self._touch(directory)
+            return entry, True
+        index = self._read_index(directory)
+        candidates = sorted(
+            ((n_rows, fp) for fp, n_rows in index.items() if n_rows < len(feature_matrix)), reverse=True
+        )
+        for n_rows, fp in candidates:
+            if fingerprint(feature_matrix[:n_rows]) == fp:
+                entry = self._load(os.path.join(directory, f"{fp}.pkl"))
+                if entry is not None:
+                    self._touch(directory)
+                    return entry, False
+        return None, False
+
+    def save(self, params: Dict[str, Any], feature_matrix: np.ndarray, entry: Dict[str, Any]) -> None:
+        group = self.group_key(params, feature_matrix)
+        directory = os.path.join(self.root, group)
+        os.makedirs(directory, exist_ok=True)
+        entry = dict(entry, n_rows=len(feature_matrix), fingerprint=fingerprint(feature_matrix), params=params)
+        path = os.path.join(directory, f"{entry['fingerprint']}.pkl")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp, path)
+        self._remember(path, entry)
+        with self._lock:
+            index = self._read_index(directory)
+            index[entry["fingerprint"]] = entry["n_rows"]
+            self._write_index(directory, index)
+        self._prune(directory)
+        self._evict_groups(keep=group)
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if path in self._memo:
+                self._memo.move_to_end(path)
+                return self._memo[path]
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            # Unreadable (e.g. written by another sklearn version): treat as a miss.
+            return None
+        self._remember(path, entry)
+        return entry
+
+    def _remember(self, path: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memo[path] = entry
+            self._memo.move_to_end(path)
+            while len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+
+    def _forget(self, prefix: str) -> None:
+        with self._lock:
+            for path in [p for p in self._memo if p.startswith(prefix)]:
+                del self._memo[path]
+
+    @staticmethod
+    def _read_index(directory: str) -> Dict[str, int]:
+        try:
+            with open(os.path.join(directory, "index.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_index(directory: str, index: Dict[str, int]) -> None:
+        path = os.path.join(directory, "index.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _touch(directory: str) -> None:
+        try:
+            os.utime(os.path.join(directory, "index.json"))
+        except OSError:
+            pass
+
+    def _prune(self, directory: str) -> None:
+        paths = [os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".pkl")]
+        if len(paths) <= self.max_per_group:
+            return
+        paths.sort(key=os.path.getmtime)
+        removed = paths[: len(paths) - self.max_per_group]
+        for path in removed:
+            self._forget(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            index = self._read_index(directory)
+            for path in removed:
+                index.pop(os.path.basename(path)[: -len(".pkl")], None)
+            self._write_index(directory, index)
+
+    def _evict_groups(self, keep: str) -> None:
+        """Remove the least recently used groups beyond max_groups (use = index.json mtime)."""
+        groups = []
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if not os.path.isdir(directory) or name == keep:
+                continue
+            try:
+                used = os.path.getmtime(os.path.join(directory, "index.json"))
+            except OSError:
+                used = 0.0
+            groups.append((used, directory))
+        groups.sort()
+        for _, directory in groups[: max(0, len(groups) + 1 - self.max_groups)]:
+            self._forget(directory + os.sep)
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# Process-wide store used by CoreEngine.
+regime_model_store = RegimeModelStore(cfg.REGIME_MODEL_DIR)
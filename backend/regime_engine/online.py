@@ -0,0 +1,54 @@
+"""
+Online Regime Detector: causal regime detection at constant cost per day.
+Regime labels use the same per-row rules as RegimeEngine (drawdown, volatility and trend
+thresholds on the current feature row), which depend on no fitted state and no later rows,
+so they are already free of look-ahead. Fed by a StreamingFeatureEngine, each row's features
+are themselves computed from past bars only.
+"""
+
+import warnings
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from .detector import REGIME_LABELS, RegimeEngine
+
+
+class OnlineRegimeDetector:
+    """
+    update(row) -> int8 regime code (REGIME_LABELS[code]); row is (vol, drawdown, trend)
+    or a StreamingFeatureEngine row (per-asset arrays, averaged across assets).
+    Only rows seen so far are ever used, so regimes are free of look-ahead.
+    """
+
+    def __init__(self, vol_threshold: float = 0.25, drawdown_threshold: float = -0.15):
+        self._rules = RegimeEngine(vol_threshold, drawdown_threshold)
+        self.n_rows = 0
+        self.regime: Optional[int] = None
+
+    @staticmethod
+    def aggregate(row: Union[Dict[str, np.ndarray], np.ndarray]) -> np.ndarray:
+        """(vol, drawdown, trend) with the same cross-sectional mean / NaN handling as RegimeEngine."""
+        if isinstance(row, dict):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                row = [np.nanmean(row[k]) for k in ("volatility", "drawdown", "trend_signal")]
+        return np.nan_to_num(np.asarray(row, dtype=float), nan=0.0)
+
+    def update(self, row: Union[Dict[str, np.ndarray], np.ndarray]) -> int:
+        x = self.aggregate(row)
+        self.n_rows += 1
+        self.regime = int(self._rules.label_codes(x[None, :])[0])
+        return self.regime
+
+    @property
+    def regime_label(self) -> Optional[str]:
+        return None if self.regime is None else REGIME_LABELS[self.regime]
+
+    def run(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Codes for rows in order (same as label_codes on the whole matrix: the rules are per row)."""
+        self.n_rows += len(feature_matrix)
+        codes = self._rules.label_codes(self.aggregate(feature_matrix))
+        if len(codes):
+            self.regime = int(codes[-1])
+        return codes
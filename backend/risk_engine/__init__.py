@@ -1,3 +1,34 @@
-from .engine import RiskEngine
+from .engine import (
+    FLAG_DRAWDOWN,
+    FLAG_STOP_LOSS,
+    FLAG_VAR_LIMIT,
+    FLAG_VOL_TARGET,
+    RiskEngine,
+    flag_names,
+)
+from .var import VAR_METHODS, VaREngine
+from .drawdown import DrawdownTracker
+from .covariance import (
+    CovarianceModel,
+    EWMACovariance,
+    LedoitWolfCovariance,
+    PCAFactorCovariance,
+    get_covariance_model,
+)
 
-__all__ = ["RiskEngine"]
+__all__ = [
+    "RiskEngine",
+    "FLAG_STOP_LOSS",
+    "FLAG_VOL_TARGET",
+    "FLAG_DRAWDOWN",
+    "FLAG_VAR_LIMIT",
+    "flag_names",
+    "VaREngine",
+    "VAR_METHODS",
+    "DrawdownTracker",
+    "CovarianceModel",
+    "EWMACovariance",
+    "LedoitWolfCovariance",
+    "PCAFactorCovariance",
+    "get_covariance_model",
+]
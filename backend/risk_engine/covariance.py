@@ -0,0 +1,281 @@
+"""
+Covariance Service: incrementally updated covariance estimators for risk and allocation.
+- ledoit_wolf: rolling window, Ledoit-Wolf shrinkage toward a scaled identity
+- ewma: exponentially weighted (RiskMetrics-style decay)
+- pca: rolling statistical factor model, B F B' + D with K principal components
+Every model consumes one daily return row at a time (update) and serves covariance-vector
+products (matvec) without a dense N x N matrix where the model allows it: the window models
+work from the W x N window and its W x W Gram matrix (O(N*W) per product), the factor model in
+O(N*K). Daily returns are treated as zero-mean, as is usual for daily risk models.
+"""
+
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+
+class CovarianceModel:
+    """
+    Base class. update(row) adds one day; fit(returns) resets and consumes a whole history.
+    matvec(w) = Cov @ w, variance(w) = w' Cov w, covariance() = dense N x N (small universes).
+    All quantities are daily (annualize with * 252).
+    """
+
+    name = "base"
+    # Consuming more rows than this at once goes through fit (vectorized) instead of update.
+    refit_gap = 64
+
+    def __init__(self, n_assets: int):
+        self.n_assets = n_assets
+        self.n_obs = 0  # rows consumed since the last reset
+
+    def reset(self) -> None:
+        self.n_obs = 0
+
+    def update(self, row: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def fit(self, returns) -> "CovarianceModel":
+        self.reset()
+        for row in np.asarray(returns, dtype=float):
+            self.update(row)
+        return self
+
+    def advance_to(self, values: np.ndarray, rows: int) -> "CovarianceModel":
+        """
+        Bring the model to exactly values[:rows] of one T x N history: incremental when moving
+        forward, refit when moving back (or far ahead).
+        """
+        if rows < self.n_obs or rows - self.n_obs > self.refit_gap:
+            self.fit(values[:rows])
+        else:
+            for row in values[self.n_obs : rows]:
+                self.update(row)
+        return self
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def variance(self, w: np.ndarray) -> float:
+        w = np.asarray(w, dtype=float)
+        return float(w @ self.matvec(w))
+
+    def covariance(self) -> np.ndarray:
+        raise NotImplementedError
+
+
+class _WindowModel(CovarianceModel):
+    """Ring buffer of the last `window` rows plus their Gram matrix, both updated in O(N*W) per row."""
+
+    def __init__(self, n_assets: int, window: int = 63):
+        super().__init__(n_assets)
+        self.window = window
+        self.refit_gap = window
+        self._x = np.zeros((window, n_assets))
+        self._gram = np.zeros((window, window))
+
+    @property
+    def n_rows(self) -> int:
+        """Rows in the current window."""
+        return min(self.n_obs, self.window)
+
+    def reset(self) -> None:
+        super().reset()
+        self._x[:] = 0.0
+        self._gram[:] = 0.0
+
+    def update(self, row: np.ndarray) -> None:
+        x = np.nan_to_num(np.asarray(row, dtype=float), nan=0.0)
+        slot = self.n_obs % self.window
+        self._x[slot] = x
+        g = self._x @ x
+        self._gram[slot, :] = g
+        self._gram[:, slot] = g
+        self.n_obs += 1
+
+    def fit(self, returns) -> "_WindowModel":
+        values = np.nan_to_num(np.asarray(returns, dtype=float), nan=0.0)
+        self.reset()
+        tail = values[-self.window :]
+        # Keep ring positions consistent with row-by-row updates.
+        slots = np.arange(len(values) - len(tail), len(values)) % self.window
+        self._x[slots] = tail
+        self._gram[:] = self._x @ self._x.T
+        self.n_obs = len(values)
+        return self
+
+    def _sample_matvec(self, w: np.ndarray) -> np.ndarray:
+        """S w with S = X'X / n_rows, without forming S."""
+        return self._x.T @ (self._x @ w) / max(self.n_rows, 1)
+
+    def _sample_covariance(self) -> np.ndarray:
+        return self._x.T @ self._x / max(self.n_rows, 1)
+
+
+class LedoitWolfCovariance(_WindowModel):
+    """
+    Rolling-window Ledoit-Wolf shrinkage: (1 - s) S + s mu I, mu = trace(S) / N.
+    The optimal intensity s comes from the Gram matrix alone (same estimator as
+    sklearn.covariance.ledoit_wolf with assume_centered=True), so it costs O(W^2) per refresh.
+    """
+
+    name = "ledoit_wolf"
+
+    def __init__(self, n_assets: int, window: int = 63):
+        super().__init__(n_assets, window)
+        self._stats_at = -1
+        self._shrinkage = 0.0
+        self._mu = 0.0
+
+    def _stats(self):
+        if self._stats_at != self.n_obs:
+            n, p = max(self.n_rows, 1), self.n_assets
+            sq_norms = np.diag(self._gram)  # ||x_t||^2
+            trace = sq_norms.sum() / n
+            mu = trace / p
+            s_frob = (self._gram ** 2).sum() / n ** 2  # ||S||_F^2
+            beta = ((sq_norms ** 2).sum() / n - s_frob) / (p * n)
+            delta = (s_frob - 2.0 * mu * trace + p * mu ** 2) / p
+            beta = min(beta, delta)
+            self._shrinkage = 0.0 if beta <= 0 or delta <= 0 else beta / delta
+            self._mu = mu
+            self._stats_at = self.n_obs
+        return self._shrinkage, self._mu
+
+    @property
+    def shrinkage(self) -> float:
+        return self._stats()[0]
+
+    def reset(self) -> None:
+        super().reset()
+        self._stats_at = -1
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        s, mu = self._stats()
+        w = np.asarray(w, dtype=float)
+        return (1.0 - s) * self._sample_matvec(w) + s * mu * w
+
+    def covariance(self) -> np.ndarray:
+        s, mu = self._stats()
+        cov = (1.0 - s) * self._sample_covariance()
+        cov[np.diag_indices_from(cov)] += s * mu
+        return cov
+
+
+class PCAFactorCovariance(_WindowModel):
+    """
+    Rolling statistical factor model: Cov = B diag(f) B' + diag(d) from the top n_factors
+    principal components of the window (eigendecomposition of the W x W Gram matrix, so cost
+    does not grow with N^2). Factors are re-extracted every refit_every rows; specific
+    variances d follow the window in between. matvec is O(N * K).
+    """
+
+    name = "pca"
+
+    def __init__(self, n_assets: int, window: int = 252, n_factors: int = 5, refit_every: int = 21):
+        super().__init__(n_assets, window)
+        self.n_factors = n_factors
+        self.refit_every = refit_every
+        self._fitted_at: Optional[int] = None
+        self._specific_at = -1
+        self.loadings = np.zeros((n_assets, 0))  # B, orthonormal columns
+        self.factor_variance = np.zeros(0)  # f
+        self.specific_variance = np.zeros(n_assets)  # d
+
+    def reset(self) -> None:
+        super().reset()
+        self._fitted_at = None
+        self._specific_at = -1
+
+    def _refresh(self) -> None:
+        if self._fitted_at is not None and self.n_obs - self._fitted_at < self.refit_every:
+            self._update_specific()
+            return
+        n = max(self.n_rows, 1)
+        k = min(self.n_factors, self.n_rows, self.n_assets)
+        eigval, eigvec = np.linalg.eigh(self._gram)
+        top = np.argsort(eigval)[::-1][:k]
+        eigval, eigvec = np.clip(eigval[top], 0.0, None), eigvec[:, top]
+        keep = eigval > 1e-12 * max(eigval.max(initial=0.0), 1e-300)
+        eigval, eigvec = eigval[keep], eigvec[:, keep]
+        self.loadings = self._x.T @ eigvec / np.sqrt(eigval)  # right singular vectors
+        self.factor_variance = eigval / n
+        self._fitted_at = self.n_obs
+        self._update_specific()
+
+    def _update_specific(self) -> None:
+        n = max(self.n_rows, 1)
+        total = (self._x ** 2).sum(axis=0) / n
+        common = (self.loadings ** 2) @ self.factor_variance
+        self.specific_variance = np.clip(total - common, 0.0, None)
+        self._specific_at = self.n_obs
+
+    def _ready(self) -> None:
+        if self._fitted_at is None or self._specific_at != self.n_obs:
+            self._refresh()
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        self._ready()
+        w = np.asarray(w, dtype=float)
+        return self.loadings @ (self.factor_variance * (self.loadings.T @ w)) + self.specific_variance * w
+
+    def covariance(self) -> np.ndarray:
+        self._ready()
+        cov = (self.loadings * self.factor_variance) @ self.loadings.T
+        cov[np.diag_indices_from(cov)] += self.specific_variance
+        return cov
+
+
+class EWMACovariance(CovarianceModel):
+    """
+    Exponentially weighted covariance, S_t = decay * S_{t-1} + (1 - decay) * x_t x_t',
+    bias-corrected for short histories. Dense N x N state; O(N^2) per update and product.
+    """
+
+    name = "ewma"
+
+    def __init__(self, n_assets: int, decay: float = 0.94):
+        super().__init__(n_assets)
+        self.decay = decay
+        self._s = np.zeros((n_assets, n_assets))
+
+    def reset(self) -> None:
+        super().reset()
+        self._s[:] = 0.0
+
+    def update(self, row: np.ndarray) -> None:
+        x = np.nan_to_num(np.asarray(row, dtype=float), nan=0.0)
+        self._s *= self.decay
+        self._s += (1.0 - self.decay) * np.outer(x, x)
+        self.n_obs += 1
+
+    def fit(self, returns) -> "EWMACovariance":
+        values = np.nan_to_num(np.asarray(returns, dtype=float), nan=0.0)
+        self.reset()
+        weights = (1.0 - self.decay) * self.decay ** np.arange(len(values) - 1, -1, -1)
+        self._s[:] = (values * weights[:, None]).T @ values
+        self.n_obs = len(values)
+        return self
+
+    def _correction(self) -> float:
+        return 1.0 / (1.0 - self.decay ** self.n_obs) if self.n_obs else 0.0
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        return self._s @ np.asarray(w, dtype=float) * self._correction()
+
+    def covariance(self) -> np.ndarray:
+        return self._s * self._correction()
+
+
+COVARIANCE_MODELS: Dict[str, Type[CovarianceModel]] = {
+    LedoitWolfCovariance.name: LedoitWolfCovariance,
+    EWMACovariance.name: EWMACovariance,
+    PCAFactorCovariance.name: PCAFactorCovariance,
+}
+
+
+def get_covariance_model(name: str, n_assets: int, **kwargs) -> CovarianceModel:
+    """Covariance model by name: ledoit_wolf | ewma | pca (kwargs go to the constructor)."""
+    if name not in COVARIANCE_MODELS:
+        raise ValueError(f"Unknown covariance model: {name}")
+    return COVARIANCE_MODELS[name](n_assets, **kwargs)
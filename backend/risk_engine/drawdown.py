@@ -0,0 +1,59 @@
+"""
+Drawdown Tracker: running peak, current / max drawdown and time under water, O(1) per value.
+Fed one equity value at a time by the backtest or simulator (or caught up with sync), so
+drawdown protection and decision logging never rescan the equity curve.
+"""
+
+import math
+from typing import Sequence
+
+
+class DrawdownTracker:
+    """
+    update(value) -> current drawdown, (value - peak) / peak, NaN while the peak is 0.
+    NaN values are counted but otherwise skipped (as cummax() skips them).
+    time_under_water: values since the last new peak.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.n_obs = 0  # values fed, including NaN
+        self.n_valid = 0
+        self.value = math.nan
+        self.peak = math.nan
+        self.drawdown = math.nan
+        self.max_drawdown = 0.0
+        self.time_under_water = 0
+
+    def update(self, value: float) -> float:
+        self.n_obs += 1
+        value = float(value)
+        if math.isnan(value):
+            return self.drawdown
+        self.n_valid += 1
+        self.value = value
+        if self.n_valid == 1 or value >= self.peak:
+            self.peak = value
+            self.time_under_water = 0
+        else:
+            self.time_under_water += 1
+        self.drawdown = (value - self.peak) / self.peak if self.peak != 0 else math.nan
+        if self.drawdown < self.max_drawdown:
+            self.max_drawdown = self.drawdown
+        return self.drawdown
+
+    def sync(self, curve: Sequence[float]) -> "DrawdownTracker":
+        """
+        Catch up with a growing equity curve (Series, array or list): feeds only the values
+        not seen yet; a curve shorter than what was seen means a new run and resets first.
+        """
+        n = len(curve)
+        if n < self.n_obs:
+            self.reset()
+        if n > self.n_obs:
+            tail = curve.iloc[self.n_obs :] if hasattr(curve, "iloc") else curve[self.n_obs :]
+            for value in tail:
+                self.update(value)
+        return self
@@ -5,15 +5,46 @@ Can be disabled for backtest comparison (with vs without risk).
 
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+from .. import config as cfg
+from ..data_engine.rolling_cov import RollingCovariance
+from .covariance import CovarianceModel, get_covariance_model
+from .drawdown import DrawdownTracker
+from .var import VaREngine
+
+# Bitmask of the overlays that fired on a rebalance (RiskEngine.last_flags / apply_matrix).
+FLAG_STOP_LOSS = 1
+FLAG_VOL_TARGET = 2
+FLAG_DRAWDOWN = 4
+FLAG_VAR_LIMIT = 8
+FLAG_NAMES = {
+    FLAG_STOP_LOSS: "stop_loss",
+    FLAG_VOL_TARGET: "vol_target",
+    FLAG_DRAWDOWN: "drawdown",
+    FLAG_VAR_LIMIT: "var_limit",
+}
+
+
+def flag_names(flags: int) -> List[str]:
+    """Names of the overlays set in a flags bitmask."""
+    return [name for bit, name in FLAG_NAMES.items() if int(flags) & bit]
 
 
 class RiskEngine:
     """
     A) Volatility targeting: scale down if portfolio vol > target.
     B) Drawdown protection: reduce exposure if drawdown > limit.
+    E) VaR limit (optional): scale down if the portfolio's daily VaR (var_method, see VaREngine)
+       exceeds var_limit. Applied after vol targeting.
     C) Position sizing: low-risk assets get higher weight (inverse vol).
     D) Stop-loss: zero weight if asset return below threshold (optional).
+    Portfolio vol uses the sample covariance of the last vol_window days, read from a rolling
+    covariance tensor (rolling_cov, shareable between engines over the same returns; built on
+    first use), or a covariance_model (name or CovarianceModel, e.g. "ledoit_wolf" / "ewma" / "pca")
+    advanced day by day. Vol is memoized per (day, weights).
+    apply() handles one rebalance (its overlays are left in last_flags); apply_matrix() a whole
+    R x N weight matrix in one vectorized pass.
     """
 
     def __init__(
@@ -25,6 +56,10 @@ class RiskEngine:
         stop_loss_threshold: Optional[float] = None,  # e.g. -0.05 for -5% daily
         enabled: bool = True,
         vol_window: int = 21,
+        covariance_model: Optional[Union[str, CovarianceModel]] = None,
+        rolling_cov: Optional[RollingCovariance] = None,
+        var_limit: Optional[float] = None,  # e.g. 0.02 = 2% daily VaR
+        var_method: str = cfg.VAR_METHOD,
     ):
         self.returns = returns
         self.vol_target = vol_target
@@ -33,6 +68,19 @@ class RiskEngine:
         self.stop_loss_threshold = stop_loss_threshold
         self.enabled = enabled
         self.vol_window = vol_window
+        if isinstance(covariance_model, str):
+            covariance_model = get_covariance_model(covariance_model, returns.shape[1])
+        self.covariance_model = covariance_model
+        self._returns_values: Optional[np.ndarray] = None
+        if rolling_cov is not None and rolling_cov.window != vol_window:
+            raise ValueError(f"rolling_cov window {rolling_cov.window} != vol_window {vol_window}")
+        self.rolling_cov = rolling_cov
+        self._vol_memo_index = -1
+        self._vol_memo: Dict[Tuple, float] = {}
+        self.var_limit = var_limit
+        self.var_method = var_method
+        self.var_engine = VaREngine()
+        self.last_flags = 0
 
     def apply(
         self,
@@ -40,10 +88,14 @@ class RiskEngine:
         index: int,
         equity_curve: Optional[pd.Series] = None,
         last_returns: Optional[pd.Series] = None,
+        drawdown: Optional[DrawdownTracker] = None,
     ) -> Dict[str, float]:
         """
         Returns risk-adjusted weights. If enabled=False, returns weights unchanged.
+        drawdown (a tracker fed with the equity curve) is read in O(1); without it the
+        drawdown is recomputed from equity_curve.
         """
+        self.last_flags = 0
         if not self.enabled:
             return dict(weights)
         w = dict(weights)
@@ -52,38 +104,171 @@ class RiskEngine:
             for ticker in list(w.keys()):
                 if ticker in last_returns.index and last_returns[ticker] < self.stop_loss_threshold:
                     w[ticker] = 0.0
+                    self.last_flags |= FLAG_STOP_LOSS
         w = self._normalize(w)
         # A) Vol targeting
         port_vol = self._portfolio_vol(w, index)
         if port_vol > 1e-8 and port_vol > self.vol_target:
             scale = self.vol_target / port_vol
             w = {k: v * scale for k, v in w.items()}
+            self.last_flags |= FLAG_VOL_TARGET
+
+        # E) VaR limit
+        if self.var_limit is not None:
+            vec = np.array([[w.get(t, 0.0) for t in self.returns.columns]])
+            var = self.var_engine.at(self._values(), vec, np.array([index]), self.var_method)[0][0]
+            if var > self.var_limit:
+                scale = self.var_limit / var
+                w = {k: v * scale for k, v in w.items()}
+                self.last_flags |= FLAG_VAR_LIMIT
         
         # B) Drawdown protection
-        if equity_curve is not None and len(equity_curve) > 0:
+        current_dd = np.nan
+        if drawdown is not None:
+            current_dd = drawdown.drawdown
+        elif equity_curve is not None and len(equity_curve) > 0:
             cummax = equity_curve.cummax()
             dd = (equity_curve - cummax) / cummax.replace(0, np.nan)
             current_dd = dd.iloc[-1] if hasattr(dd, "iloc") else float(dd)
-            if not np.isnan(current_dd) and current_dd < self.max_drawdown_limit:
-                w = {k: v * self.exposure_floor for k, v in w.items()}
-        
+        if not np.isnan(current_dd) and current_dd < self.max_drawdown_limit:
+            w = {k: v * self.exposure_floor for k, v in w.items()}
+            self.last_flags |= FLAG_DRAWDOWN
+
         return w
 
+    def apply_matrix(
+        self,
+        weights: np.ndarray,
+        indices: np.ndarray,
+        drawdowns: Optional[np.ndarray] = None,
+        portfolio_variance: Optional[np.ndarray] = None,
+        last_returns: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        apply() for R rebalances at once. weights: R x N (columns = returns.columns);
+        indices: day index per row; drawdowns: current drawdown per row (NaN = unknown);
+        portfolio_variance: annualized variance per row of the stop-loss-adjusted, normalized
+        weights (computed from the rolling covariance if None); last_returns: R x N returns of
+        the previous day (read from returns if None). Same rules as apply, up to rounding.
+        Returns (adjusted R x N weights, uint8 flags per row: FLAG_STOP_LOSS | FLAG_VOL_TARGET |
+        FLAG_VAR_LIMIT | FLAG_DRAWDOWN).
+        """
+        w = np.array(weights, dtype=float)
+        indices = np.asarray(indices, dtype=np.intp)
+        flags = np.zeros(len(w), dtype=np.uint8)
+        if not self.enabled:
+            return w, flags
+
+        # D) Stop-loss per asset
+        if self.stop_loss_threshold is not None:
+            if last_returns is None:
+                last_returns = self._values()[np.maximum(indices - 1, 0)]
+            stop = (np.asarray(last_returns) < self.stop_loss_threshold) & (indices > 0)[:, None]
+            w[stop] = 0.0
+            flags[stop.any(axis=1)] |= FLAG_STOP_LOSS
+        total = w.sum(axis=1, keepdims=True)
+        w = np.where(total > 0, w / np.where(total > 0, total, 1.0), w)
+
+        # A) Vol targeting
+        if portfolio_variance is None:
+            portfolio_variance = self.portfolio_variance(w, indices)
+        port_vol = np.sqrt(np.nan_to_num(np.asarray(portfolio_variance, dtype=float), nan=0.0).clip(0.0))
+        scaled = (port_vol > 1e-8) & (port_vol > self.vol_target)
+        w[scaled] *= (self.vol_target / port_vol[scaled])[:, None]
+        flags[scaled] |= FLAG_VOL_TARGET
+
+        # E) VaR limit
+        if self.var_limit is not None:
+            var = self.var_engine.at(self._values(), w, indices, self.var_method)[0]
+            with np.errstate(invalid="ignore"):
+                limited = var > self.var_limit
+            w[limited] *= (self.var_limit / var[limited])[:, None]
+            flags[limited] |= FLAG_VAR_LIMIT
+
+        # B) Drawdown protection
+        if drawdowns is not None:
+            with np.errstate(invalid="ignore"):
+                breached = np.asarray(drawdowns, dtype=float) < self.max_drawdown_limit
+            w[breached] *= self.exposure_floor
+            flags[breached] |= FLAG_DRAWDOWN
+        return w, flags
+
+    def portfolio_variance(self, weights: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        Annualized variance w_r' Cov_r w_r per row (covariance of the vol_window days before
+        indices[r]); 0 where the window is short or undefined, as in _portfolio_vol.
+        """
+        weights = np.asarray(weights, dtype=float)
+        indices = np.asarray(indices, dtype=np.intp)
+        out = np.zeros(len(weights))
+        if self.covariance_model is not None:
+            for r, (row, index) in enumerate(zip(weights, indices)):
+                vol = self._model_vol(dict(zip(self.returns.columns, row)), int(index))
+                out[r] = vol * vol
+            return out
+        valid = indices >= self.vol_window
+        if not valid.any():
+            return out
+        tensor = self._tensor()
+        if tensor is not None:
+            cov = np.asarray(tensor[indices[valid] - 1], dtype=float)
+        else:
+            cov = np.stack([self.rolling_cov.window_covariance(int(index) - 1) for index in indices[valid]])
+        var = np.einsum("rn,rnm,rm->r", weights[valid], cov, weights[valid]) * 252
+        out[valid] = np.where(np.isnan(cov).any(axis=(1, 2)), 0.0, var)
+        return out
+
     def _portfolio_vol(self, weights: Dict[str, float], index: int) -> float:
+        if index != self._vol_memo_index:
+            self._vol_memo_index = index
+            self._vol_memo.clear()
+        key = tuple(weights.items())
+        vol = self._vol_memo.get(key)
+        if vol is None:
+            if self.covariance_model is not None:
+                vol = self._model_vol(weights, index)
+            else:
+                vol = self._window_vol(weights, index)
+            self._vol_memo[key] = vol
+        return vol
+
+    def _tensor(self) -> Optional[np.ndarray]:
+        """Full T x N x N rolling covariance (built once) when within RISK_COV_TENSOR_MAX_BYTES, else None."""
+        if self.rolling_cov is None:
+            self.rolling_cov = RollingCovariance(self.returns, self.vol_window)
+        rc = self.rolling_cov
+        n = len(rc.columns)
+        if len(rc) * n * n * rc.dtype.itemsize <= cfg.RISK_COV_TENSOR_MAX_BYTES:
+            return rc.covariance()
+        return None
+
+    def _covariance(self, index: int) -> np.ndarray:
+        """Daily sample covariance of returns[index - vol_window:index] (rolling row index - 1)."""
+        self._tensor()
+        return self.rolling_cov.window_covariance(index - 1)
+
+    def _window_vol(self, weights: Dict[str, float], index: int) -> float:
         if index < self.vol_window:
             return 0.0
-        start_index = index - self.vol_window
-        window = self.returns.iloc[start_index:index]
-        cov = window.cov() * 252
-        if cov.isnull().values.any():
+        cov = self._covariance(index) * 252
+        if np.isnan(cov).any():
             return 0.0
-        tickers = list(weights.keys())
-        try:
-            cov = cov.reindex(index=tickers, columns=tickers).fillna(0)
-            w = np.array([weights[t] for t in tickers])
-            return float(np.sqrt(np.dot(w, np.dot(cov, w))))
-        except Exception:
+        w = np.array([weights.get(t, 0.0) for t in self.returns.columns])
+        return float(np.sqrt(np.dot(w, np.dot(cov, w))))
+
+    def _model_vol(self, weights: Dict[str, float], index: int) -> float:
+        """Annualized vol from the covariance model fed with returns before day index."""
+        model = self.covariance_model.advance_to(self._values(), index)
+        if model.n_obs < 2:
             return 0.0
+        w = np.array([weights.get(t, 0.0) for t in self.returns.columns])
+        return float(np.sqrt(max(model.variance(w), 0.0) * 252))
+
+    def _values(self) -> np.ndarray:
+        """returns as a T x N float array (built once)."""
+        if self._returns_values is None:
+            self._returns_values = self.returns.to_numpy(dtype=float)
+        return self._returns_values
 
     def _normalize(self, w: Dict[str, float]) -> Dict[str, float]:
         total = sum(w.values())
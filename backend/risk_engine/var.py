@@ -0,0 +1,169 @@
+"""
+VaR / CVaR Engine: rolling tail risk of a portfolio over every day of a backtest.
+Day t prices the window of asset returns before t with the weights held on t (historical
+simulation of the current portfolio), then estimates:
+- historical: empirical quantile and tail mean of the window
+- gaussian / cornish_fisher: from the window's moments (Cornish-Fisher adds skew and excess kurtosis)
+- monte_carlo: horizon-day compounded paths of Student-t shocks scaled to the window's mean and vol;
+  one paths x horizon draw matrix is shared by every day and evaluated in batched arrays
+VaR and CVaR (expected shortfall) are positive loss fractions over the horizon.
+"""
+
+from statistics import NormalDist
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .. import config as cfg
+
+VAR_METHODS = ("historical", "gaussian", "cornish_fisher", "monte_carlo")
+
+
+class VaREngine:
+    """
+    rolling(returns, weights, method) -> DataFrame(var, cvar) for every day of returns.
+    at(values, weights, indices, method) -> (var, cvar) arrays for selected days.
+    horizon > 1 scales historical / parametric estimates by square-root-of-time
+    (mean by horizon); monte_carlo compounds explicit horizon-day paths.
+    """
+
+    def __init__(
+        self,
+        confidence: float = cfg.VAR_CONFIDENCE,
+        window: int = cfg.VAR_WINDOW,
+        horizon: int = 1,
+        n_paths: int = cfg.VAR_MC_PATHS,
+        t_df: float = 5.0,
+        seed: int = 42,
+        max_chunk_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.confidence = confidence
+        self.window = window
+        self.horizon = horizon
+        self.n_paths = n_paths
+        self.t_df = t_df
+        self.seed = seed
+        self.max_chunk_bytes = max_chunk_bytes
+        self._shocks: Optional[np.ndarray] = None
+
+    def rolling(
+        self,
+        returns: pd.DataFrame,
+        weights: Union[pd.DataFrame, pd.Series, np.ndarray, Dict[str, float]],
+        method: str = "historical",
+    ) -> pd.DataFrame:
+        """
+        VaR / CVaR for every day of returns. weights: constant (dict, Series or N-vector),
+        a T x N array, or a DataFrame of weights by rebalance date (held until the next one).
+        Days without a full window are NaN.
+        """
+        w = self._weight_matrix(returns, weights)
+        indices = np.arange(len(returns))
+        var, cvar = self.at(returns.to_numpy(dtype=float), w, indices, method)
+        return pd.DataFrame({"var": var, "cvar": cvar}, index=returns.index)
+
+    def at(
+        self,
+        values: np.ndarray,
+        weights: np.ndarray,
+        indices: np.ndarray,
+        method: str = "historical",
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(VaR, CVaR) per row: weights[r] priced on values[indices[r] - window : indices[r]]."""
+        if method not in VAR_METHODS:
+            raise ValueError(f"Unknown VaR method: {method}")
+        values = np.asarray(values, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        indices = np.asarray(indices, dtype=np.intp)
+        var = np.full(len(indices), np.nan)
+        cvar = np.full(len(indices), np.nan)
+        rows = np.flatnonzero(indices >= self.window)
+        if not len(rows):
+            return var, cvar
+        windows = np.lib.stride_tricks.sliding_window_view(values, self.window, axis=0)  # (T-W+1, N, W)
+        n, w_len = values.shape[1], self.window
+        chunk = max(1, self.max_chunk_bytes // (n * w_len * 8))
+        for a in range(0, len(rows), chunk):
+            r = rows[a : a + chunk]
+            samples = np.einsum("rnw,rn->rw", windows[indices[r] - w_len], weights[r])
+            var[r], cvar[r] = self._estimate(samples, method)
+        return var, cvar
+
+    def _estimate(self, samples: np.ndarray, method: str) -> Tuple[np.ndarray, np.ndarray]:
+        """samples: R x W portfolio returns -> (VaR, CVaR), positive losses."""
+        alpha = 1.0 - self.confidence
+        h = self.horizon
+        if method == "historical":
+            ordered = np.sort(samples, axis=1)
+            k = max(1, int(np.ceil(alpha * ordered.shape[1])))
+            q = ordered[:, k - 1]
+            tail = ordered[:, :k].mean(axis=1)
+            mu = samples.mean(axis=1)
+            scale = np.sqrt(h)
+            return -(mu * h + (q - mu) * scale), -(mu * h + (tail - mu) * scale)
+
+        mu = samples.mean(axis=1)
+        sigma = samples.std(axis=1, ddof=1)
+        if method == "monte_carlo":
+            return self._monte_carlo(mu, sigma)
+
+        normal = NormalDist()
+        z = normal.inv_cdf(alpha)
+        if method == "gaussian":
+            q, tail = np.full_like(mu, z), np.full_like(mu, -normal.pdf(z) / alpha)
+        else:
+            centered = samples - mu[:, None]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                skew = (centered ** 3).mean(axis=1) / sigma ** 3
+                kurt = (centered ** 4).mean(axis=1) / sigma ** 4 - 3.0
+            skew, kurt = np.nan_to_num(skew), np.nan_to_num(kurt)
+            q = self._cornish_fisher(z, skew, kurt)
+            # Expected shortfall: average of the adjusted quantile over tail levels (midpoint rule).
+            levels = (np.arange(32) + 0.5) / 32 * alpha
+            grid = np.array([normal.inv_cdf(p) for p in levels])
+            tail = self._cornish_fisher(grid[None, :], skew[:, None], kurt[:, None]).mean(axis=1)
+        scale = sigma * np.sqrt(h)
+        return -(mu * h + q * scale), -(mu * h + tail * scale)
+
+    @staticmethod
+    def _cornish_fisher(z, skew, kurt):
+        return (
+            z
+            + (z ** 2 - 1) * skew / 6
+            + (z ** 3 - 3 * z) * kurt / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36
+        )
+
+    def _monte_carlo(self, mu: np.ndarray, sigma: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self._shocks is None:
+            rng = np.random.default_rng(self.seed)
+            shocks = rng.standard_t(self.t_df, size=(self.n_paths, self.horizon))
+            self._shocks = shocks * np.sqrt((self.t_df - 2) / self.t_df)  # unit variance
+        alpha = 1.0 - self.confidence
+        k = max(1, int(np.ceil(alpha * self.n_paths)))
+        var = np.empty(len(mu))
+        cvar = np.empty(len(mu))
+        chunk = max(1, self.max_chunk_bytes // (self.n_paths * self.horizon * 8))
+        for a in range(0, len(mu), chunk):
+            m, s = mu[a : a + chunk, None, None], sigma[a : a + chunk, None, None]
+            pnl = np.prod(1.0 + m + s * self._shocks[None, :, :], axis=2) - 1.0  # days x paths
+            worst = np.partition(pnl, k - 1, axis=1)[:, :k]
+            var[a : a + chunk] = -worst.max(axis=1)
+            cvar[a : a + chunk] = -worst.mean(axis=1)
+        return var, cvar
+
+    @staticmethod
+    def _weight_matrix(returns: pd.DataFrame, weights) -> np.ndarray:
+        columns = returns.columns
+        if isinstance(weights, pd.DataFrame):
+            held = weights.reindex(columns=columns).fillna(0.0)
+            return held.reindex(returns.index, method="ffill").fillna(0.0).to_numpy(dtype=float)
+        if isinstance(weights, dict):
+            weights = pd.Series(weights)
+        if isinstance(weights, pd.Series):
+            weights = weights.reindex(columns).fillna(0.0).to_numpy(dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        if weights.ndim == 1:
+            return np.broadcast_to(weights, (len(returns), len(columns)))
+        return weights